@@ -0,0 +1,88 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from ...models import Category, Event, User
+from ...serializers import EventSerializer, EventValuesSerializer
+from ...service.event_query_service import EventQueryService
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares EventSerializer with the .values() based EventValuesSerializer on generated events. "
+        "Everything runs inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000])
+        parser.add_argument('--repeat', type=int, default=3, help="Runs per path, the best one is reported")
+
+    def handle(self, *args, **options):
+        renderer = JSONRenderer()
+        with transaction.atomic():
+            organizer, category = self._create_fixtures()
+            created = 0
+            for rows in sorted(options['rows']):
+                self._create_events(organizer, category, created, rows - created)
+                created = rows
+                events = EventQueryService().search_events()[:rows]
+
+                model_time, model_output = self._best_of(options['repeat'], lambda: renderer.render(
+                    EventSerializer(list(events), many=True).data
+                ))
+                values_time, values_output = self._best_of(options['repeat'], lambda: renderer.render(
+                    EventValuesSerializer().render(EventValuesSerializer().prepare(events))
+                ))
+
+                self.stdout.write(
+                    f"{rows:>7} rows | EventSerializer {model_time * 1000:9.1f} ms | "
+                    f"EventValuesSerializer {values_time * 1000:9.1f} ms | "
+                    f"speedup {model_time / values_time:5.2f}x | "
+                    f"identical output: {model_output == values_output}"
+                )
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def _best_of(repeat, run):
+        best, output = None, None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            output = run()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, output
+
+    @staticmethod
+    def _create_fixtures():
+        organizer = User.objects.create_user(
+            email='benchmark-organizer@example.com',
+            username='benchmark-organizer',
+            password=None,
+            first_name='Benchmark',
+            last_namne='Organizer'
+        )
+        category = Category.objects.create(name='Benchmark category', created_by=organizer)
+        return organizer, category
+
+    @staticmethod
+    def _create_events(organizer, category, offset, count):
+        start = timezone.now() + timedelta(days=1)
+        Event.objects.bulk_create([
+            Event(
+                title=f"Benchmark event {index}",
+                slug=f"benchmark-event-{index}",
+                description="Generated for the listing benchmark",
+                organizer=organizer,
+                category=category,
+                location="Benchmark city",
+                venue="Benchmark hall",
+                start_date=start + timedelta(minutes=index),
+                end_date=start + timedelta(minutes=index, hours=2),
+                capacity=100,
+                price='10.00',
+                status='published',
+            )
+            for index in range(offset, offset + count)
+        ], batch_size=1000)
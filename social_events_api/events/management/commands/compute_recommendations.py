@@ -0,0 +1,28 @@
+import time
+from django.core.management.base import BaseCommand
+from ...service.recommendation_service import RecommendationService
+
+
+class Command(BaseCommand):
+    help = "Scores upcoming events for every active user and stores each user's top recommendations"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=RecommendationService.user_chunk_size,
+            help="Number of users scored per batch"
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        users = stored = 0
+        for progress in RecommendationService().compute(chunk_size=options['chunk_size']):
+            users += progress['users']
+            stored += progress['recommendations']
+            if options['verbosity'] > 1:
+                self.stdout.write(f"Scored users up to id {progress['last_id']} ({progress['recommendations']} stored)")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored {stored} recommendations for {users} users in {time.perf_counter() - started:.1f}s"
+        ))
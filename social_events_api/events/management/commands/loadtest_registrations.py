@@ -0,0 +1,115 @@
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+from django.utils import timezone
+from ...models import Category, Event, Registration, User
+from ...service.registration_service import RegistrationService
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulates a ticket release: many threads register distinct users for one event at once. "
+        "Checks that the event is never oversold and reports registrations per second. "
+        "Works on committed fixture rows, which are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--capacity', type=int, default=50)
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--threads', type=int, default=16)
+
+    def handle(self, *args, **options):
+        tag = uuid.uuid4().hex[:8]
+        users = self._create_users(tag, options['users'])
+        event = self._create_event(tag, users[0], options['capacity'])
+
+        try:
+            outcomes, elapsed = self._run(event, users, options['threads'])
+            self._report(event, outcomes, elapsed, options['capacity'])
+        finally:
+            Event.objects.filter(pk=event.pk).delete()
+            Category.objects.filter(name=f"Load test {tag}").delete()
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+    def _run(self, event, users, thread_count):
+        outcomes = Counter()
+        lock = threading.Lock()
+        start = threading.Barrier(thread_count + 1)
+        slices = [users[index::thread_count] for index in range(thread_count)]
+
+        def worker(attendees):
+            service = RegistrationService()
+            start.wait()
+            try:
+                for attendee in attendees:
+                    # Each attempt sees the event as loaded by the request, like the API does
+                    data = {'event': Event.objects.get(pk=event.pk), 'attendee': attendee}
+                    try:
+                        validation = service.validate_creation(data)
+                        result = service.create(data) if validation.success else validation
+                        outcome = 'registered' if result.success else result.error_message
+                    except DatabaseError as error:
+                        outcome = type(error).__name__
+                    with lock:
+                        outcomes[outcome] += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(attendees,)) for attendees in slices]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        return outcomes, time.perf_counter() - started
+
+    def _report(self, event, outcomes, elapsed, capacity):
+        event.refresh_from_db(fields=['seats_remaining'])
+        stored = Registration.objects.filter(event=event).exclude(status='cancelled').count()
+        attempts = sum(outcomes.values())
+
+        self.stdout.write(
+            f"attempts: {attempts} in {elapsed:.2f}s ({attempts / elapsed:.0f}/s) | "
+            f"registered: {outcomes['registered']} ({outcomes['registered'] / elapsed:.0f}/s)\n"
+            f"outcomes: {dict(outcomes)}\n"
+            f"capacity: {capacity} | registrations: {stored} | seats_remaining: {event.seats_remaining}"
+        )
+        if stored > capacity or stored != outcomes['registered'] or stored + event.seats_remaining != capacity:
+            raise CommandError("Seat accounting diverged under concurrency")
+        if stored < min(capacity, attempts) and not any(key.endswith('Error') for key in outcomes):
+            raise CommandError("Seats were left unsold although attendees were turned away")
+        self.stdout.write(self.style.SUCCESS("No oversell"))
+
+    @staticmethod
+    def _create_users(tag, count):
+        return User.objects.bulk_create([
+            User(
+                email=f"loadtest-{tag}-{index}@example.com",
+                username=f"loadtest-{tag}-{index}",
+                first_name='Load',
+                last_namne='Test'
+            )
+            for index in range(max(count, 1))
+        ])
+
+    @staticmethod
+    def _create_event(tag, organizer, capacity):
+        category = Category.objects.create(name=f"Load test {tag}", created_by=organizer)
+        start = timezone.now() + timedelta(days=1)
+        return Event.objects.create(
+            title=f"Load test event {tag}",
+            description="Generated for the registration load test",
+            organizer=organizer,
+            category=category,
+            location="Load test city",
+            venue="Load test hall",
+            start_date=start,
+            end_date=start + timedelta(hours=2),
+            capacity=capacity,
+            status='published',
+        )
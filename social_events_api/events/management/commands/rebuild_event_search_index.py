@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from ...service.event_search_service import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the full-text index used by event search from the events table"
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        with transaction.atomic():
+            indexed = backend.rebuild()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {indexed} events with {backend.__class__.__name__}"
+        ))
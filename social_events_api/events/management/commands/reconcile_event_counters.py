@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from ...service.event_counter_service import EventCounterService
+
+
+class Command(BaseCommand):
+    help = "Recomputes the comment, confirmed registration, favorite and remaining seat counters of every event and fixes drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=EventCounterService.DEFAULT_CHUNK_SIZE,
+            help="Number of events checked per transaction"
+        )
+
+    def handle(self, *args, **options):
+        checked = fixed = 0
+        for progress in EventCounterService().reconcile(chunk_size=options['chunk_size']):
+            checked += progress['checked']
+            fixed += progress['fixed']
+            if options['verbosity'] > 1:
+                self.stdout.write(f"Checked events up to id {progress['last_id']} ({progress['fixed']} fixed)")
+
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} events, fixed {fixed} drifted counters"))
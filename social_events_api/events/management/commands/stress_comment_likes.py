@@ -0,0 +1,116 @@
+import random
+import threading
+import uuid
+from collections import Counter
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+from django.utils import timezone
+from ...models import Category, Comment, Event, User
+from ...service.comment_service import CommentService
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammers the like toggle of one comment from many threads and checks that the stored "
+        "likes_count matches both the like rows and the expected final state. Works on committed "
+        "fixture rows, which are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--users', type=int, default=25)
+        parser.add_argument('--toggles', type=int, default=50, help="Toggles per thread")
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        tag = uuid.uuid4().hex[:8]
+        users = self._create_users(tag, options['users'])
+        comment = self._create_comment(tag, users[0])
+
+        try:
+            plans = [
+                [rng.choice(users) for _ in range(options['toggles'])]
+                for _ in range(options['threads'])
+            ]
+            applied, errors = self._run(comment, plans)
+            self._verify(comment, applied, errors)
+        finally:
+            Event.objects.filter(pk=comment.event_id).delete()
+            Category.objects.filter(name=f"Stress {tag}").delete()
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+    def _run(self, comment, plans):
+        applied, errors = Counter(), Counter()
+        lock = threading.Lock()
+        start = threading.Barrier(len(plans))
+
+        def worker(plan):
+            service = CommentService()
+            start.wait()
+            try:
+                for user in plan:
+                    try:
+                        service.like(comment, user)
+                    except DatabaseError as error:
+                        # The toggle rolled back as a whole, so it simply did not happen
+                        with lock:
+                            errors[type(error).__name__] += 1
+                        continue
+                    with lock:
+                        applied[user.pk] += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(plan,)) for plan in plans]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return applied, errors
+
+    def _verify(self, comment, applied, errors):
+        # Toggles commute, so each user ends up liking the comment iff they toggled an odd number of times
+        expected = {user_id for user_id, toggles in applied.items() if toggles % 2}
+        stored = Comment.objects.values_list('likes_count', flat=True).get(pk=comment.pk)
+        actual = set(comment.likes.values_list('id', flat=True))
+
+        self.stdout.write(
+            f"toggles applied: {sum(applied.values())} | failed: {sum(errors.values())} {dict(errors) or ''}\n"
+            f"expected likes: {len(expected)} | like rows: {len(actual)} | stored likes_count: {stored}"
+        )
+        if actual != expected or stored != len(actual):
+            raise CommandError("Like state diverged under concurrency")
+        self.stdout.write(self.style.SUCCESS("likes_count is consistent"))
+
+    @staticmethod
+    def _create_users(tag, count):
+        return [
+            User.objects.create_user(
+                email=f"stress-{tag}-{index}@example.com",
+                username=f"stress-{tag}-{index}",
+                password=None,
+                first_name='Stress',
+                last_namne='Test'
+            )
+            for index in range(max(count, 1))
+        ]
+
+    @staticmethod
+    def _create_comment(tag, author):
+        category = Category.objects.create(name=f"Stress {tag}", created_by=author)
+        start = timezone.now() + timedelta(days=1)
+        event = Event.objects.create(
+            title=f"Stress event {tag}",
+            description="Generated for the like stress test",
+            organizer=author,
+            category=category,
+            location="Stress city",
+            venue="Stress hall",
+            start_date=start,
+            end_date=start + timedelta(hours=2),
+            capacity=100,
+            status='published',
+        )
+        return Comment.objects.create(event=event, author=author, content="Like me")
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+
+FTS_TABLE = 'events_event_fts'
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        "title, description, location, venue, tokenize='unicode61 remove_diacritics 2')"
+    )
+    schema_editor.execute(
+        f"INSERT INTO {FTS_TABLE} (rowid, title, description, location, venue) "
+        "SELECT id, title, description, location, venue FROM events_event"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
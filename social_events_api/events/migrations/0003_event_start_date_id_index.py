@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0002_event_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['start_date', 'id'], name='events_even_start_d_8ea970_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:44
+
+from django.db import migrations, models
+
+
+def backfill_counters(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    Comment = apps.get_model('events', 'Comment')
+    Registration = apps.get_model('events', 'Registration')
+    events = Event._meta.db_table
+    favorites = Event._meta.get_field('favorites').remote_field.through._meta.db_table
+
+    schema_editor.execute(
+        f"UPDATE {events} SET "
+        f"comments_count = (SELECT COUNT(*) FROM {Comment._meta.db_table} c WHERE c.event_id = {events}.id), "
+        f"confirmed_registrations_count = (SELECT COUNT(*) FROM {Registration._meta.db_table} r "
+        f"WHERE r.event_id = {events}.id AND r.status = 'confirmed'), "
+        f"favorites_count = (SELECT COUNT(*) FROM {favorites} f WHERE f.event_id = {events}.id)"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0003_event_start_date_id_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='confirmed_registrations_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
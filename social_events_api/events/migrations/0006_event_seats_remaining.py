@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:51
+
+from django.db import migrations, models
+
+
+def backfill_seats_remaining(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    Registration = apps.get_model('events', 'Registration')
+    events = Event._meta.db_table
+    taken = (
+        f"(SELECT COUNT(*) FROM {Registration._meta.db_table} r "
+        f"WHERE r.event_id = {events}.id AND r.status <> 'cancelled')"
+    )
+
+    schema_editor.execute(
+        f"UPDATE {events} SET seats_remaining = "
+        f"CASE WHEN capacity > {taken} THEN capacity - {taken} ELSE 0 END"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0005_event_coordinates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='seats_remaining',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_seats_remaining, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['status', 'start_date', 'seats_remaining'], name='events_even_status_1a9087_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:54
+
+from django.db import migrations, models
+
+
+def backfill_likes_count(apps, schema_editor):
+    Comment = apps.get_model('events', 'Comment')
+    comments = Comment._meta.db_table
+    likes = Comment._meta.get_field('likes').remote_field.through._meta.db_table
+
+    schema_editor.execute(
+        f"UPDATE {comments} SET "
+        f"likes_count = (SELECT COUNT(*) FROM {likes} l WHERE l.comment_id = {comments}.id)"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0006_event_seats_remaining'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_likes_count, migrations.RunPython.noop),
+    ]
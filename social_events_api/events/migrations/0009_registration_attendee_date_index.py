@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0008_waitlist'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(fields=['attendee', 'registration_date'], name='events_regi_attende_249460_idx'),
+        ),
+    ]
@@ -1,7 +1,11 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser, BaseUserManager
-from django.core.validators import MinValueValidator, EmailValidator
+from django.core.validators import MinValueValidator, MaxValueValidator, EmailValidator
+from django.db.models import F, Prefetch, Value
+from django.db.models.functions import Greatest
 from django.utils.text import slugify
+from .utils.geo import encode_geohash
+from .utils.query import count_subquery
 
 class CustomUserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
@@ -18,6 +22,17 @@ class CustomUserManager(BaseUserManager):
         extra_fields.setdefault('is_superuser', True)
         return self.create_user(email, password, **extra_fields)
 
+    def with_follow_counts(self):
+        """Annotates the followers_count and following_count UserSerializer reads, instead of two COUNTs per user"""
+        return self.get_queryset().annotate(
+            followers_count=count_subquery(UserFollow.objects.all(), 'following_id'),
+            following_count=count_subquery(UserFollow.objects.all(), 'follower_id'),
+        )
+
+    def prefetch_with_follow_counts(self, lookup):
+        """Loads the users behind a relation such as 'organizer' with their follow counts, in one query per page"""
+        return Prefetch(lookup, queryset=self.with_follow_counts())
+
 class User(AbstractUser):
     username = models.CharField(max_length=150, unique=True)
     first_name = models.CharField(max_length=150, null=False, blank=False)
@@ -103,6 +118,27 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+class EventManager(models.Manager):
+    COUNTER_FIELDS = ('comments_count', 'confirmed_registrations_count', 'favorites_count', 'seats_remaining')
+
+    def adjust_counters(self, event_id, **deltas):
+        """Applies relative changes to the denormalized counters in a single UPDATE, never going below zero"""
+        updates = {
+            field: Greatest(F(field) + delta, Value(0))
+            for field, delta in deltas.items()
+            if field in self.COUNTER_FIELDS and delta
+        }
+        if updates:
+            self.filter(pk=event_id).update(**updates)
+
+    def reserve_seats(self, event_id, seats: int = 1) -> bool:
+        """Takes seats in one conditional UPDATE that only matches while enough remain; False when full"""
+        reserved = self.filter(pk=event_id, seats_remaining__gte=seats).update(
+            seats_remaining=F('seats_remaining') - seats
+        )
+        return reserved == 1
+
+
 class Event(models.Model):
     STATUS_CHOICES = [
         ('draft', 'Draft'),
@@ -117,6 +153,15 @@ class Event(models.Model):
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, related_name='events')
     location = models.CharField(max_length=200)
     venue = models.CharField(max_length=200)
+    latitude = models.FloatField(
+        null=True, blank=True,
+        validators=[MinValueValidator(-90), MaxValueValidator(90)]
+    )
+    longitude = models.FloatField(
+        null=True, blank=True,
+        validators=[MinValueValidator(-180), MaxValueValidator(180)]
+    )
+    geohash = models.CharField(max_length=12, blank=True, db_index=True, editable=False)
     start_date = models.DateTimeField()
     end_date = models.DateTimeField()
     capacity = models.PositiveIntegerField(validators=[MinValueValidator(1)])
@@ -127,17 +172,31 @@ class Event(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     favorites = models.ManyToManyField(User, related_name='favorite_events', blank=True)
+    comments_count = models.PositiveIntegerField(default=0)
+    confirmed_registrations_count = models.PositiveIntegerField(default=0)
+    favorites_count = models.PositiveIntegerField(default=0)
+    seats_remaining = models.PositiveIntegerField(default=0)
+
+    objects = EventManager()
     
     class Meta:
         ordering = ['-start_date']
         indexes = [
             models.Index(fields=['start_date', 'status']),
+            models.Index(fields=['start_date', 'id']),
             models.Index(fields=['slug']),
+            models.Index(fields=['status', 'start_date', 'seats_remaining']),
         ]
     
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
+        if self._state.adding:
+            self.seats_remaining = self.capacity
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = encode_geohash(self.latitude, self.longitude)
+        else:
+            self.geohash = ''
         super().save(*args, **kwargs)
     
     def __str__(self):
@@ -160,10 +219,98 @@ class Registration(models.Model):
     class Meta:
         unique_together = ['event', 'attendee']
         ordering = ['-registration_date']
+        indexes = [
+            models.Index(fields=['attendee', 'registration_date']),
+        ]
     
     def __str__(self):
         return f"{self.attendee.username} - {self.event.title}"
 
+class CheckIn(models.Model):
+    """Door check-in of a registration, written in batches from verified check-in tokens"""
+    registration = models.OneToOneField(Registration, on_delete=models.CASCADE, related_name='check_in')
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='check_ins')
+    checked_in_at = models.DateTimeField()
+    scanned_by = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
+
+    def __str__(self):
+        return f"Check-in of registration {self.registration_id} at {self.checked_in_at}"
+
+class WaitlistEntry(models.Model):
+    """Place in the FIFO queue of a full event; promoted to a registration when a seat frees up"""
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='waitlist')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='waitlist_entries')
+    position = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['position']
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'user'], name='unique_waitlist_user'),
+            models.UniqueConstraint(fields=['event', 'position'], name='unique_waitlist_position'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} waiting for {self.event.title} (#{self.position})"
+
+class Activity(models.Model):
+    """Something a user did with an event, shown in the feeds of their followers"""
+    VERB_CHOICES = [
+        ('organized', 'Organized'),
+        ('favorited', 'Favorited'),
+        ('registered', 'Registered')
+    ]
+
+    actor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='activities')
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='activities')
+    verb = models.CharField(max_length=10, choices=VERB_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        unique_together = ['actor', 'event', 'verb']
+        indexes = [
+            models.Index(fields=['actor', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.actor.username} {self.verb} {self.event.title}"
+
+class FeedEntry(models.Model):
+    """Activity copied into a follower's feed when it was written (fan-out on write)"""
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='feed_entries')
+    activity = models.ForeignKey(Activity, on_delete=models.CASCADE, related_name='feed_entries')
+    # Copied from the activity so feeds can be trimmed without a join
+    created_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-created_at']
+        unique_together = ['owner', 'activity']
+        indexes = [
+            models.Index(fields=['owner', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"Activity {self.activity_id} in the feed of user {self.owner_id}"
+
+class Recommendation(models.Model):
+    """Precomputed top-K event for a user, written by the compute_recommendations job"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='recommendations')
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='recommendations')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['rank']
+        unique_together = ['user', 'event']
+        indexes = [
+            models.Index(fields=['user', 'rank']),
+        ]
+
+    def __str__(self):
+        return f"#{self.rank} {self.event.title} for {self.user.username}"
+
 class Comment(models.Model):
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='comments')
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='event_comments')
@@ -172,6 +319,8 @@ class Comment(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     parent = models.ForeignKey('self', null=True, blank=True, on_delete=models.CASCADE, related_name='replies')
     likes = models.ManyToManyField(User, related_name='liked_comments', blank=True)
+    # Maintained by CommentService.like
+    likes_count = models.PositiveIntegerField(default=0)
     
     class Meta:
         ordering = ['-created_at']
@@ -1,9 +1,13 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from .models import Category, Event, Registration, Comment, UserFollow, UserPreferences
+from .models import Activity, Category, Recommendation, Event, Registration, Comment, UserFollow, UserPreferences
+from .utils.query import count_subquery
 from django.core.validators import EmailValidator
 from rest_framework.validators import UniqueValidator
 from django.utils import timezone
+from django.db.models import Value
+from django.db.models.fields.files import FieldFile
+from rest_framework.relations import RelatedField
 from drf_yasg.utils import swagger_serializer_method
 
 User = get_user_model()
@@ -65,10 +69,14 @@ class UserSerializer(serializers.ModelSerializer):
 
     @swagger_serializer_method(serializer_or_field=serializers.IntegerField)
     def get_followers_count(self, obj):
+        if hasattr(obj, 'followers_count'):
+            return obj.followers_count
         return obj.followers.count()
 
     @swagger_serializer_method(serializer_or_field=serializers.IntegerField)
     def get_following_count(self, obj):
+        if hasattr(obj, 'following_count'):
+            return obj.following_count
         return obj.following.count()
 
 
@@ -151,8 +159,13 @@ class CategoryCreateSerializer(serializers.ModelSerializer):
 
 class CommentSerializer(serializers.ModelSerializer):
     replies = serializers.SerializerMethodField()
-    likes_count = serializers.SerializerMethodField()
+    likes_count = serializers.IntegerField(
+        read_only=True,
+        help_text="The number of likes this comment has received."
+    )
     replies_count = serializers.SerializerMethodField(read_only=True)
+    replies_cursor = serializers.SerializerMethodField()
+    has_more_replies = serializers.SerializerMethodField()
     author_id = serializers.IntegerField(
         source='author.id', 
         read_only=True,
@@ -163,7 +176,8 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ['id', 'event', 'author_id', 'content', 'created_at', 
-                    'updated_at', 'parent', 'replies', 'likes_count', 'replies_count']
+                    'updated_at', 'parent', 'replies', 'likes_count', 'replies_count', 'replies_cursor',
+                    'has_more_replies']
         read_only_fields = ['created_at', 'updated_at', 'replies_count']
         extra_kwargs = {
             'event': {'help_text': 'The ID of the event this comment is associated with.'},
@@ -176,27 +190,44 @@ class CommentSerializer(serializers.ModelSerializer):
         help_text="A list of replies to this comment."
     ))
     def get_replies(self, obj):
-        if obj.parent is None:  # Only get replies for parent comments
-            replies = Comment.objects.filter(parent=obj)
-            return CommentSerializer(replies, many=True).data
+        if obj.parent_id is None:  # Only get replies for parent comments
+            # Threads assembled by CommentService.get_by_event carry their replies already
+            replies = getattr(obj, 'thread_replies', None)
+            if replies is None:
+                replies = Comment.objects.filter(parent=obj)
+            return CommentSerializer(replies, many=True, context=self.context).data
         return []
 
-    @swagger_serializer_method(serializer_or_field=serializers.IntegerField(
-        help_text="The number of likes this comment has received."
-    ))
-    def get_likes_count(self, obj):
-        return obj.likes.count()
-
     @swagger_serializer_method(serializer_or_field=serializers.IntegerField(
         help_text="The number of replies this comment has received."
     ))
     def get_replies_count(self, obj):
+        if hasattr(obj, 'replies_count'):
+            return obj.replies_count
         return obj.replies.count() 
 
+    @swagger_serializer_method(serializer_or_field=serializers.CharField(
+        allow_null=True,
+        help_text="Cursor for the replies endpoint to load the replies not embedded here; null when none "
+                  "are embedded, in which case has_more_replies says whether to read its first page."
+    ))
+    def get_replies_cursor(self, obj):
+        return getattr(obj, 'replies_cursor', None)
+
+    @swagger_serializer_method(serializer_or_field=serializers.BooleanField(
+        help_text="Whether replies beyond the embedded ones exist on the replies endpoint."
+    ))
+    def get_has_more_replies(self, obj):
+        # Only threads assembled by CommentService.get_by_event embed a window of their replies
+        replies = getattr(obj, 'thread_replies', None)
+        if replies is None:
+            return False
+        return self.get_replies_count(obj) > len(replies)
+
 
 class CommentCreateSerializer(serializers.ModelSerializer):
     author = serializers.PrimaryKeyRelatedField(read_only=True)
-    likes_count = serializers.SerializerMethodField(read_only=True)
+    likes_count = serializers.IntegerField(read_only=True)
     replies_count = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
@@ -212,11 +243,6 @@ class CommentCreateSerializer(serializers.ModelSerializer):
             'parent': {'help_text': 'The ID of the parent comment (if this is a reply).'}
         }
 
-    @swagger_serializer_method(serializer_or_field=serializers.IntegerField)
-    def get_likes_count(self, obj):
-
-        return obj.likes.count()
-
     @swagger_serializer_method(serializer_or_field=serializers.IntegerField)
     def get_replies_count(self, obj):
         return obj.replies.count()
@@ -274,6 +300,103 @@ class RegistrationCreateSerializer(serializers.ModelSerializer):
         }
 
 
+class EventSummarySerializer(serializers.ModelSerializer):
+    category = CategorySerializer(read_only=True)
+
+    class Meta:
+        model = Event
+        fields = ['id', 'title', 'slug', 'start_date', 'end_date', 'location', 'venue', 'status', 'category']
+
+
+class ActivitySerializer(serializers.ModelSerializer):
+    """Feed item: what a followed user did with an event"""
+    actor_username = serializers.CharField(
+        source='actor.username',
+        read_only=True,
+        help_text="Username of the user who acted."
+    )
+    event = EventSummarySerializer(read_only=True)
+
+    class Meta:
+        model = Activity
+        fields = ['id', 'verb', 'actor', 'actor_username', 'event', 'created_at']
+        read_only_fields = fields
+
+
+class RecommendationSerializer(serializers.ModelSerializer):
+    """Recommended event with its rank and score for the requesting user"""
+    event = EventSummarySerializer(read_only=True)
+
+    class Meta:
+        model = Recommendation
+        fields = ['rank', 'score', 'event', 'computed_at']
+        read_only_fields = fields
+
+
+class UserRegistrationSerializer(serializers.ModelSerializer):
+    """Registration with a summary of its event, rendered from a single joined query"""
+    event = EventSummarySerializer(read_only=True)
+
+    class Meta:
+        model = Registration
+        fields = ['id', 'event', 'attendee', 'status', 'registration_date', 'cancelled_date', 'notes']
+        read_only_fields = fields
+        extra_kwargs = {
+            'attendee': {'help_text': 'The ID of the registered user.'},
+        }
+
+
+class BulkRegistrationSerializer(serializers.Serializer):
+    MAX_ATTENDEES = 500
+
+    event = serializers.PrimaryKeyRelatedField(
+        queryset=Event.objects.all(),
+        help_text="The ID of the event the group is registered for."
+    )
+    attendees = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=MAX_ATTENDEES,
+        help_text="IDs of the users to register."
+    )
+    status = serializers.ChoiceField(
+        choices=[('pending', 'Pending'), ('confirmed', 'Confirmed')],
+        default='pending',
+        help_text="Status given to every created registration."
+    )
+    notes = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        help_text="Optional notes stored on every created registration."
+    )
+
+
+class CheckInSerializer(serializers.Serializer):
+    token = serializers.CharField(help_text="Check-in token read from the attendee's QR code.")
+
+
+class CheckInScanSerializer(serializers.Serializer):
+    token = serializers.CharField(help_text="Check-in token read from the attendee's QR code.")
+    scanned_at = serializers.DateTimeField(
+        required=False,
+        help_text="When the scanner read the code; defaults to the time of the sync."
+    )
+
+
+class CheckInSyncSerializer(serializers.Serializer):
+    MAX_SCANS = 1000
+
+    scans = CheckInScanSerializer(
+        many=True,
+        help_text="Scans collected while the scanner was offline."
+    )
+
+    def validate_scans(self, scans):
+        if not scans or len(scans) > self.MAX_SCANS:
+            raise serializers.ValidationError(f"Send between 1 and {self.MAX_SCANS} scans.")
+        return scans
+
+
 class EventSerializer(serializers.ModelSerializer):
     organizer = UserSerializer(
         read_only=True,
@@ -283,10 +406,13 @@ class EventSerializer(serializers.ModelSerializer):
         read_only=True,
         help_text="Details of the event category."
     )
-    comments_count = serializers.SerializerMethodField(
+    comments_count = serializers.IntegerField(
+        read_only=True,
         help_text="Total number of comments associated with the event."
     )
-    registrations_count = serializers.SerializerMethodField(
+    registrations_count = serializers.IntegerField(
+        source='confirmed_registrations_count',
+        read_only=True,
         help_text="Total number of confirmed registrations for the event."
     )
     is_favorited = serializers.SerializerMethodField(
@@ -297,23 +423,39 @@ class EventSerializer(serializers.ModelSerializer):
         model = Event
         fields = [
             'id', 'title', 'slug', 'description', 'organizer', 
-            'category', 'location', 'venue', 'start_date', 'end_date',
-            'capacity', 'price', 'image', 'status', 'is_private',
-            'created_at', 'updated_at', 'comments_count', 
+            'category', 'location', 'venue', 'latitude', 'longitude',
+            'start_date', 'end_date', 'capacity', 'price', 'image', 'status',
+            'is_private', 'created_at', 'updated_at', 'comments_count', 
             'registrations_count', 'is_favorited'
         ]
         read_only_fields = ['slug', 'created_at', 'updated_at']
 
-    @swagger_serializer_method(serializer_or_field=serializers.IntegerField)
-    def get_comments_count(self, obj):
-        return obj.comments.count()
+    EXPANDABLE_FIELDS = ('organizer', 'category')
 
-    @swagger_serializer_method(serializer_or_field=serializers.IntegerField)
-    def get_registrations_count(self, obj):
-        return obj.registrations.filter(status='confirmed').count()
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        """
+        Optional sparse fieldset: `fields` limits the output, and relations not listed
+        in `expand` are rendered as their ids instead of nested objects.
+        """
+        super().__init__(*args, **kwargs)
+        if fields is None and expand is None:
+            return
+
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+        for name in self.EXPANDABLE_FIELDS:
+            if name in self.fields and name not in (expand or ()):
+                self.fields[name] = serializers.PrimaryKeyRelatedField(
+                    read_only=True,
+                    help_text=f"ID of the event {name}; pass expand={name} for the full object."
+                )
 
     @swagger_serializer_method(serializer_or_field=serializers.BooleanField)
     def get_is_favorited(self, obj):
+        if hasattr(obj, 'is_favorited'):
+            return obj.is_favorited
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.favorites.filter(id=request.user.id).exists()
@@ -334,6 +476,7 @@ class EventCreateSerializer(serializers.ModelSerializer):
         help_text="Total number of comments associated with the event."
     )
     registrations_count = serializers.IntegerField(
+        source='confirmed_registrations_count',
         read_only=True, 
         help_text="Total number of users registered for the event."
     )
@@ -354,9 +497,9 @@ class EventCreateSerializer(serializers.ModelSerializer):
         model = Event
         fields = [
             'id', 'title', 'slug', 'description', 'organizer', 
-            'category', 'location', 'venue', 'start_date', 'end_date',
-            'capacity', 'price', 'image', 'status', 'is_private',
-            'created_at', 'updated_at', 'comments_count', 
+            'category', 'location', 'venue', 'latitude', 'longitude',
+            'start_date', 'end_date', 'capacity', 'price', 'image', 'status',
+            'is_private', 'created_at', 'updated_at', 'comments_count', 
             'registrations_count', 'is_favorited'
         ]
         extra_kwargs = {
@@ -365,6 +508,8 @@ class EventCreateSerializer(serializers.ModelSerializer):
             'category': {'help_text': 'The category ID to which the event belongs.'},
             'location': {'help_text': 'The geographical location of the event.'},
             'venue': {'help_text': 'The venue or specific address where the event will be held.'},
+            'latitude': {'help_text': 'Optional latitude of the venue, used by the near= search filter.'},
+            'longitude': {'help_text': 'Optional longitude of the venue, used by the near= search filter.'},
             'start_date': {'help_text': 'The start date and time of the event in YYYY-MM-DD HH:MM format.'},
             'end_date': {'help_text': 'The end date and time of the event in YYYY-MM-DD HH:MM format.'},
             'capacity': {'help_text': 'The maximum number of attendees allowed for the event.'},
@@ -398,3 +543,95 @@ class UserFollowSerializer(serializers.ModelSerializer):
         model = UserFollow
         fields = ['id', 'follower', 'following', 'created_at']
         read_only_fields = ['created_at']
+
+
+class EventValuesSerializer:
+    """
+    Read-only renderer for high-volume event listings. Compiles EventSerializer's fields once
+    into a plan of `.values()` paths and DRF field formatters, then builds plain dicts per row,
+    skipping model and serializer instantiation. Output is identical to EventSerializer's.
+    """
+    def __init__(self, context=None, fields=None, expand=None):
+        self.template = EventSerializer(context=context or {}, fields=fields, expand=expand)
+        self.annotations = {}
+        self.plan = self._compile(self.template, prefix='')
+
+    def prepare(self, queryset):
+        """Adds the annotations the plan needs and switches the queryset to `.values()` rows"""
+        annotations = {
+            name: expression for name, expression in self.annotations.items()
+            if name not in queryset.query.annotations
+        }
+        paths = set(self._paths(self.plan))
+        paths.update(self._ordering_paths(queryset))
+        paths.add(queryset.model._meta.pk.name)
+        return queryset.annotate(**annotations).values(*sorted(paths))
+
+    def render(self, rows):
+        return [self._render_row(self.plan, row) for row in rows]
+
+    def _render_row(self, plan, row):
+        data = {}
+        for name, path, kind, formatter in plan:
+            value = row[path]
+            if kind == 'nested':
+                data[name] = None if value is None else self._render_row(formatter, row)
+            elif value is None:
+                data[name] = None
+            else:
+                data[name] = formatter(value)
+        return data
+
+    def _compile(self, serializer, prefix):
+        plan = []
+        model = serializer.Meta.model
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            path = f"{prefix}{field.source}"
+
+            if isinstance(field, serializers.SerializerMethodField):
+                alias = f"{prefix}{name}".replace('__', '_')
+                self.annotations[alias] = self._method_field_expression(serializer, name, prefix)
+                plan.append((name, alias, 'value', self._identity))
+            elif isinstance(field, serializers.BaseSerializer):
+                plan.append((name, path, 'nested', self._compile(field, prefix=f"{path}__")))
+            elif isinstance(field, RelatedField):
+                plan.append((name, path, 'value', self._identity))
+            elif isinstance(field, serializers.FileField):
+                model_field = model._meta.get_field(field.source)
+                plan.append((name, path, 'value', self._file_formatter(field, model_field)))
+            else:
+                plan.append((name, path, 'value', field.to_representation))
+        return plan
+
+    def _method_field_expression(self, serializer, name, prefix):
+        relation = prefix[:-2] if prefix else 'pk'
+        if isinstance(serializer, UserSerializer) and name == 'followers_count':
+            return count_subquery(UserFollow.objects.all(), 'following_id', relation)
+        if isinstance(serializer, UserSerializer) and name == 'following_count':
+            return count_subquery(UserFollow.objects.all(), 'follower_id', relation)
+        if isinstance(serializer, EventSerializer) and name == 'is_favorited':
+            return Value(False)
+        raise NotImplementedError(f"No values() expression for {serializer.__class__.__name__}.{name}")
+
+    @staticmethod
+    def _file_formatter(field, model_field):
+        def format_file(name):
+            return field.to_representation(FieldFile(None, model_field, name))
+        return format_file
+
+    @staticmethod
+    def _identity(value):
+        return value
+
+    def _paths(self, plan):
+        for _, path, kind, formatter in plan:
+            yield path
+            if kind == 'nested':
+                yield from self._paths(formatter)
+
+    @staticmethod
+    def _ordering_paths(queryset):
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        return [name.lstrip('-') for name in ordering if isinstance(name, str) and name.lstrip('-') != 'pk']
@@ -0,0 +1,156 @@
+from datetime import timedelta
+from typing import Any, Dict, List, Set
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from ..models import CheckIn, Event, Registration, User
+from ..utils.cache import TTLCache
+from ..utils.checkin_token import CheckInClaims, issue_token, verify_token
+from ..utils.result import Result
+from ..utils.write_buffer import BatchBuffer
+
+
+def _write_check_ins(check_ins: List[CheckIn]) -> Set[int]:
+    """
+    Stores the check-ins of registrations that are still confirmed and returns their ids.
+    Only those are remembered as scanned, so a dropped check-in is never reported as done;
+    the registrations dropped are revoked so their next scan is rejected.
+    """
+    confirmed = set(
+        Registration.objects
+        .filter(pk__in=[check_in.registration_id for check_in in check_ins], status='confirmed')
+        .values_list('id', flat=True)
+    )
+    CheckIn.objects.bulk_create(
+        [check_in for check_in in check_ins if check_in.registration_id in confirmed],
+        ignore_conflicts=True
+    )
+    for check_in in check_ins:
+        if check_in.registration_id in confirmed:
+            CheckInService.scanned.set(check_in.registration_id, True)
+        else:
+            CheckInService.revoked.set(check_in.registration_id, True)
+    return confirmed
+
+
+class CheckInService:
+    """
+    Door check-in from signed tokens. Scans are verified in memory and written in batches;
+    the database only confirms, when the batch is written, that the registration was not
+    cancelled in the meantime. Organizers are cached per event so scanning stays query-free.
+    A scan is reported as queued until its batch is written; registrations cancelled through this
+    process are revoked at once, those cancelled elsewhere are dropped when the batch is written.
+    """
+    REVOKED = "Registration is no longer confirmed"
+    _config = getattr(settings, 'EVENT_CHECKIN', {})
+    token_grace = timedelta(hours=_config.get('TOKEN_GRACE_HOURS', 12))
+    pending = BatchBuffer(
+        _write_check_ins,
+        max_pending=_config.get('BATCH_SIZE', 200),
+        flush_interval=_config.get('FLUSH_INTERVAL', 2.0)
+    )
+    # Registrations already scanned by this process, to warn about reused tokens
+    scanned = TTLCache(max_entries=_config.get('MAX_SCANNED', 100000), ttl=86400)
+    # Registrations cancelled through this process, whose tokens must stop working before expiry
+    revoked = TTLCache(max_entries=_config.get('MAX_REVOKED', 100000), ttl=30 * 86400)
+    organizers = TTLCache(max_entries=4096, ttl=300)
+
+    def issue_token(self, registration: Registration) -> str:
+        """QR payload valid until token_grace after the event ends"""
+        expires_at = registration.event.end_date + self.token_grace
+        return issue_token(CheckInClaims(
+            registration.id,
+            registration.event_id,
+            registration.attendee_id,
+            int(expires_at.timestamp())
+        ))
+
+    def revoke(self, registration_id: int) -> None:
+        """Rejects the registration's token once the surrounding transaction commits"""
+        transaction.on_commit(lambda: self.revoked.set(registration_id, True))
+
+    def restore(self, registration_id: int) -> None:
+        """Accepts the registration's token again once the surrounding transaction commits"""
+        transaction.on_commit(lambda: self.revoked.delete(registration_id))
+
+    def can_scan(self, event_id: int, user: User) -> bool:
+        if user.is_staff:
+            return True
+        organizer_id = self.organizers.get(event_id)
+        if organizer_id is None:
+            organizer_id = Event.objects.filter(pk=event_id).values_list('organizer_id', flat=True).first()
+            self.organizers.set(event_id, organizer_id)
+        return organizer_id == user.id
+
+    def check_in(self, token: str, user: User) -> Result[Dict[str, Any]]:
+        verified = verify_token(token)
+        if not verified.success:
+            return verified
+        claims = verified.data
+        if not self.can_scan(claims.event_id, user):
+            return Result.failure("Not allowed to check in attendees of this event")
+        if self.revoked.get(claims.registration_id) is not None:
+            return Result.failure(self.REVOKED)
+
+        if self.scanned.get(claims.registration_id) is not None:
+            scan_status = 'already_checked_in'
+        elif self.pending.add(claims.registration_id, self._check_in_for(claims, timezone.now(), user)):
+            scan_status = 'queued'
+        else:
+            scan_status = 'already_queued'
+        return Result.success({**self._describe(claims), 'status': scan_status})
+
+    def sync(self, scans: List[Dict[str, Any]], user: User) -> List[Dict[str, Any]]:
+        """
+        Writes scans collected by an offline scanner in one pass, keeping their scan time.
+        Tokens are checked for signature only: an offline scan made before expiry still counts.
+        """
+        results, accepted = [], {}
+        for scan in scans:
+            scanned_at = scan.get('scanned_at') or timezone.now()
+            verified = verify_token(scan['token'], now=scanned_at.timestamp())
+            if not verified.success:
+                results.append({'token': scan['token'], 'status': 'invalid', 'detail': verified.error_message})
+                continue
+            claims = verified.data
+            if not self.can_scan(claims.event_id, user):
+                results.append({**self._describe(claims), 'status': 'invalid', 'detail': "Not allowed to check in attendees of this event"})
+                continue
+            if self.revoked.get(claims.registration_id) is not None:
+                results.append({**self._describe(claims), 'status': 'invalid', 'detail': self.REVOKED})
+                continue
+            if claims.registration_id in accepted:
+                results.append({**self._describe(claims), 'status': 'already_checked_in'})
+                continue
+            accepted[claims.registration_id] = self._check_in_for(claims, scanned_at, user)
+            results.append({**self._describe(claims), 'status': 'checked_in'})
+
+        already = set(
+            CheckIn.objects.filter(registration_id__in=accepted).values_list('registration_id', flat=True)
+        )
+        confirmed = _write_check_ins([
+            check_in for registration_id, check_in in accepted.items() if registration_id not in already
+        ]) if len(already) < len(accepted) else set()
+
+        for result in results:
+            registration_id = result.get('registration')
+            if result['status'] != 'checked_in':
+                continue
+            if registration_id in already:
+                result['status'] = 'already_checked_in'
+            elif registration_id not in confirmed:
+                result.update(status='invalid', detail=self.REVOKED)
+        return results
+
+    @staticmethod
+    def _check_in_for(claims: CheckInClaims, checked_in_at, user: User) -> CheckIn:
+        return CheckIn(
+            registration_id=claims.registration_id,
+            event_id=claims.event_id,
+            checked_in_at=checked_in_at,
+            scanned_by_id=user.id
+        )
+
+    @staticmethod
+    def _describe(claims: CheckInClaims) -> Dict[str, int]:
+        return {'registration': claims.registration_id, 'event': claims.event_id, 'attendee': claims.attendee_id}
@@ -1,37 +1,125 @@
+from collections import defaultdict
+from typing import List
 from django.core.exceptions import ValidationError
 from django.db import transaction
+from django.db.models import F, QuerySet, Value, Window
+from django.db.models.functions import Greatest, RowNumber
 from ..models import Comment, User, Event
+from ..utils.query import count_subquery, insert_ignoring_conflicts
 from ..utils.result import Result
+from .event_cache_service import EventCommentsCacheService, EventDetailCacheService
+from .write_behind_service import WriteBehindService
 
 class CommentService:
     def validate_authority(self, comment: Comment, user: User):
         if comment.author != user:
             raise ValidationError("You do not have permission to modify this comment.")
     
-    def get_by_event(self, event: Event):
-        return Comment.objects.filter(event=event).prefetch_related('author', 'likes')
-    
-    def get_replies(self, comment: Comment):
-        return comment.replies.select_related('author').prefetch_related('likes')
+    def get_by_event(self, event: Event) -> QuerySet:
+        """Top-level comments of the event with their counts, ready for cursor pagination"""
+        return self.with_counts(Comment.objects.filter(event=event, parent__isnull=True))
+
+    def attach_reply_windows(self, comments: List[Comment], size: int) -> List[Comment]:
+        """
+        Attaches the first `size` replies of each comment as `thread_replies` using a single
+        windowed query, so the cost depends on the page and not on how long the threads are.
+        Replies follow the same ordering as get_replies, so the rest can be paged from there.
+        """
+        if not comments or size <= 0:
+            for comment in comments:
+                comment.thread_replies = []
+            return comments
+
+        reply_order = [F('created_at').desc(), F('id').desc()]
+        windows = (
+            self.with_counts(Comment.objects.filter(parent_id__in=[comment.id for comment in comments]))
+            .annotate(position=Window(RowNumber(), partition_by=[F('parent_id')], order_by=reply_order))
+            .filter(position__lte=size)
+            .order_by(*reply_order)
+        )
+
+        replies_by_parent = defaultdict(list)
+        for reply in windows:
+            replies_by_parent[reply.parent_id].append(reply)
+
+        for comment in comments:
+            comment.thread_replies = replies_by_parent.get(comment.id, [])
+        return comments
+
+    def get_replies(self, comment: Comment) -> QuerySet:
+        return self.with_counts(comment.replies.all())
+
+    def apply_pending_likes(self, comments: List[Comment]) -> List[Comment]:
+        """
+        Read-your-writes for listings: adds the like toggles still waiting in this process' buffer
+        to the stored likes_count of the comments and of their embedded replies.
+        """
+        likes = WriteBehindService.comment_likes
+        if likes is None or not comments:
+            return comments
+
+        everything = [*comments, *(reply for comment in comments for reply in getattr(comment, 'thread_replies', []))]
+        deltas = likes.pending_deltas(comment.id for comment in everything)
+        for comment in everything:
+            if comment.id in deltas:
+                comment.likes_count = max(comment.likes_count + deltas[comment.id], 0)
+        return comments
+
+    @staticmethod
+    def with_counts(queryset: QuerySet) -> QuerySet:
+        """Joins the author and annotates replies_count, which CommentSerializer reads"""
+        return queryset.select_related('author').annotate(
+            replies_count=count_subquery(Comment.objects.all(), 'parent_id'),
+        )
 
-    @transaction.atomic
     def like(self, comment: Comment, user: User) -> dict:
-        if comment.likes.filter(id=user.id).exists():
-            comment.likes.remove(user)
-            status = 'unlike'
+        likes = WriteBehindService.comment_likes
+        if likes is None:
+            return self.__like_now(comment, user)
+
+        liked = likes.toggle(comment.id, user.id)
+        EventCommentsCacheService.invalidate(comment.event_id)
+        stored = Comment.objects.values_list('likes_count', flat=True).get(pk=comment.pk)
+        # Read-your-writes: count the toggles still waiting in the buffer
+        comment.likes_count = max(stored + likes.pending_delta(comment.id), 0)
+        return {
+            'status': 'like' if liked else 'unlike',
+            'likes_count': comment.likes_count
+        }
+
+    @transaction.atomic
+    def __like_now(self, comment: Comment, user: User) -> dict:
+        """
+        Toggles the like without reading first: a conditional delete, falling back to an insert
+        that ignores duplicates, so concurrent taps can neither double count nor fail.
+        The stored likes_count moves by exactly the rows that changed.
+        """
+        Like = Comment.likes.through
+        unliked, _ = Like.objects.filter(comment_id=comment.id, user_id=user.id).delete()
+        if unliked:
+            status, delta = 'unlike', -1
         else:
-            comment.likes.add(user)
-            status = 'like'
-        
+            liked = insert_ignoring_conflicts(Like, comment_id=comment.id, user_id=user.id)
+            status, delta = 'like', 1 if liked else 0
+
+        if delta:
+            Comment.objects.filter(pk=comment.pk).update(likes_count=Greatest(F('likes_count') + delta, Value(0)))
+        comment.likes_count = Comment.objects.values_list('likes_count', flat=True).get(pk=comment.pk)
+        EventCommentsCacheService.invalidate(comment.event_id)
+
         return {
             'status': status, 
-            'likes_count': comment.likes.count()
+            'likes_count': comment.likes_count
         }
     
     @transaction.atomic
     def create(self, data: dict, user: User) -> Comment:
         data['author'] = user
-        return Comment.objects.create(**data)
+        comment = Comment.objects.create(**data)
+        Event.objects.adjust_counters(comment.event_id, comments_count=1)
+        EventDetailCacheService.invalidate(comment.event_id)
+        EventCommentsCacheService.invalidate(comment.event_id)
+        return comment
 
     def validate_create(self, data: dict) -> Result:
         self.__validate_parent(data)
@@ -57,7 +145,7 @@ class CommentService:
 
     def get_comment_metadata(self, comment: Comment) -> dict:
         return {
-            'likes_count': comment.likes.count(),
+            'likes_count': comment.likes_count,
             'replies_count': comment.replies.count()
         }
 
@@ -70,9 +158,15 @@ class CommentService:
         
         comment.full_clean()
         comment.save()
+        EventDetailCacheService.invalidate(comment.event_id)
+        EventCommentsCacheService.invalidate(comment.event_id)
         return comment
 
     @transaction.atomic
     def delete(self, comment: Comment, user: User):
         self.validate_authority(comment, user)
-        comment.delete()
\ No newline at end of file
+        # Deleting a top-level comment cascades to its replies
+        removed = 1 + (comment.replies.count() if comment.parent_id is None else 0)
+        comment.delete()
+        Event.objects.adjust_counters(comment.event_id, comments_count=-removed)
+        EventDetailCacheService.invalidate(comment.event_id)
\ No newline at end of file
@@ -0,0 +1,177 @@
+import hashlib
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from django.conf import settings
+from django.db import transaction
+from django.utils.http import quote_etag
+from ..models import Event
+from ..utils.cache import TTLCache, GenerationCounter
+
+
+EVENTS_GENERATION = GenerationCounter('events')
+
+
+class EventSearchCacheService:
+    """
+    Caches rendered anonymous search pages. Keys embed the events generation,
+    so any event write invalidates every cached page without scanning the cache.
+    """
+    _config = getattr(settings, 'EVENT_SEARCH_CACHE', {})
+    results = TTLCache(
+        max_entries=_config.get('MAX_ENTRIES', 1024),
+        ttl=_config.get('TTL', 60)
+    )
+
+    def build_key(
+        self,
+        filters: Dict[str, Any],
+        search_query: Optional[str],
+        request,
+        fields: Optional[List[str]] = None,
+        expand: Optional[List[str]] = None
+    ) -> str:
+        normalized = {
+            'fields': fields,
+            'expand': expand,
+            'filters': sorted((key, str(value)) for key, value in filters.items()),
+            'q': (search_query or '').strip().lower(),
+            'cursor': request.query_params.get('cursor', ''),
+            'page_size': request.query_params.get('page_size', ''),
+            'host': request.get_host(),
+            'path': request.path,
+        }
+        digest = hashlib.sha1(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+        return f"event-search:{EVENTS_GENERATION.get()}:{digest}"
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.results.get(key)
+
+    def set(self, key: str, data: Any) -> None:
+        self.results.set(key, data)
+
+    def stats(self) -> Dict[str, Any]:
+        return {'generation': EVENTS_GENERATION.get(), **self.results.stats()}
+
+    @staticmethod
+    def bump_generation() -> None:
+        """Invalidates cached listings once the surrounding transaction commits"""
+        transaction.on_commit(EVENTS_GENERATION.bump)
+
+
+class EventDetailCacheService:
+    """
+    Caches the user-independent rendering of an event, reachable by id or slug.
+    The slug key only stores the event id, so both lookups share one entry. Entries are
+    checked against a per-event version in the Django cache, which writes bump.
+    """
+    _config = getattr(settings, 'EVENT_DETAIL_CACHE', {})
+    details = TTLCache(
+        max_entries=_config.get('MAX_ENTRIES', 4096),
+        ttl=_config.get('TTL', 300)
+    )
+
+    def get_or_render(self, identifier: str, render: Callable[[], Dict[str, Any]]) -> Tuple[Dict[str, Any], int]:
+        """
+        The rendering of the event and the version it reflects. The version is read before rendering,
+        so a write committing in between leaves the entry stale under the old version, never the new one.
+        """
+        event_id = self._resolve(identifier)
+        if event_id is None:
+            return render(), None
+
+        version = event_version(event_id).get()
+        cached = self.get(identifier, event_id, version)
+        if cached is not None:
+            return cached, version
+
+        data = render()
+        # A slug reassigned since it was resolved renders another event; leave that one uncached
+        if data['id'] == event_id:
+            self.details.set(self._id_key(event_id), (version, data))
+            self.details.set(self._slug_key(data['slug']), event_id)
+        return data, version
+
+    def get(self, identifier: str, event_id: int, version: int) -> Optional[Dict[str, Any]]:
+        entry = self.details.get(self._id_key(event_id))
+        if entry is None or entry[0] != version:
+            return None
+
+        data = entry[1]
+        # The slug may have changed since this alias was written
+        if not identifier.isdigit() and data['slug'] != identifier:
+            return None
+        return data
+
+    def _resolve(self, identifier: str) -> Optional[int]:
+        """Event id of an id or slug, looking uncached slugs up by the slug index"""
+        if identifier.isdigit():
+            return int(identifier)
+        event_id = self.details.get(self._slug_key(identifier))
+        if event_id is None:
+            event_id = Event.objects.filter(slug=identifier).values_list('id', flat=True).first()
+        return event_id
+
+    def etag(self, identifier: str, user) -> Optional[str]:
+        """
+        Validator of the event as seen by user, built from the per-event version without touching
+        the database. None when the identifier is a slug that is not cached yet.
+        """
+        event_id = int(identifier) if identifier.isdigit() else self.details.get(self._slug_key(identifier))
+        if event_id is None:
+            return None
+        return self.build_etag(event_id, event_version(event_id).get(), user)
+
+    @staticmethod
+    def build_etag(event_id: int, version: int, user) -> str:
+        # Favorite toggles bump the version too, so the user id is enough for is_favorited
+        user_id = user.id if user and user.is_authenticated else 0
+        return quote_etag(f"event-{event_id}-{version}-{user_id}")
+
+    @staticmethod
+    def invalidate(event_id: int) -> None:
+        """Marks the cached rendering of an event as stale once the surrounding transaction commits"""
+        transaction.on_commit(event_version(event_id).bump)
+
+    @staticmethod
+    def invalidate_organized_by(*user_ids: int) -> None:
+        """
+        Marks the renderings of every event the users organize as stale once the surrounding
+        transaction commits; they embed the organizer's profile and follow counts.
+        """
+        def bump():
+            for event_id in Event.objects.filter(organizer_id__in=user_ids).values_list('id', flat=True).iterator():
+                event_version(event_id).bump()
+        transaction.on_commit(bump)
+
+    @staticmethod
+    def _id_key(event_id) -> str:
+        return f"event-detail:id:{event_id}"
+
+    @staticmethod
+    def _slug_key(slug: str) -> str:
+        return f"event-detail:slug:{slug}"
+
+
+class EventCommentsCacheService:
+    """
+    Validators for the comment pages of an event. They change with any comment write or like
+    on the event and with the event's own version, so a deleted event never answers 304.
+    """
+    def etag(self, event_id: int, request) -> str:
+        params = hashlib.sha1(json.dumps(sorted(request.query_params.lists())).encode()).hexdigest()[:16]
+        return quote_etag(
+            f"comments-{event_id}-{event_version(event_id).get()}-{event_comments_version(event_id).get()}-{params}"
+        )
+
+    @staticmethod
+    def invalidate(event_id: int) -> None:
+        """Changes the validators of the event's comment pages once the surrounding transaction commits"""
+        transaction.on_commit(event_comments_version(event_id).bump)
+
+
+def event_version(event_id) -> GenerationCounter:
+    return GenerationCounter(f"event:{event_id}")
+
+
+def event_comments_version(event_id) -> GenerationCounter:
+    return GenerationCounter(f"event-comments:{event_id}")
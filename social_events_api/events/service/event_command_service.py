@@ -1,43 +1,121 @@
 from django.utils import timezone
-from ..models import Event
-from typing import Any, Dict, Optional
+from django.db import transaction
+from ..models import Event, Registration
+from typing import Any, Dict, Iterator, Optional
 from ..utils.result import Result
 from django.core.exceptions import ValidationError as DjangoValidationError
-from django.db.models import Q, QuerySet
+from django.db.models import F, Q, QuerySet
 from ..models import User
+from .event_cache_service import EventSearchCacheService, EventDetailCacheService
+from .feed_service import FeedService
+from .waitlist_service import WaitlistService
+from .write_behind_service import WriteBehindService
+
+EXPORT_CHUNK_SIZE = 2000
+REGISTRATION_EXPORT_FIELDS = ['id', 'status', 'registration_date', 'cancelled_date', 'notes', 'attendee_id']
+ATTENDEE_EXPORT_FIELDS = {
+    'attendee_username': 'username',
+    'attendee_email': 'email',
+    'attendee_first_name': 'first_name',
+    'attendee_last_name': 'last_namne',
+}
+REGISTRATION_EXPORT_COLUMNS = [*REGISTRATION_EXPORT_FIELDS, *ATTENDEE_EXPORT_FIELDS]
+
 
 class EventCommandService:
+    feed_service = FeedService()
+
     def create_event(self, validated_data, user):
         validated_data['organizer'] = user
-        return Event.objects.create(**validated_data)
+        event = Event.objects.create(**validated_data)
+        self.feed_service.record(user.id, event.id, 'organized')
+        EventSearchCacheService.bump_generation()
+        return event
 
     def check_user_permission(self, event, user):
         if event.organizer != user:
             raise DjangoValidationError("You do not have permission to edit or delete this event.")
 
+    @transaction.atomic
     def update_event(self, event: Event, data: Dict[str, Any], user: User) -> Result[Event]:
         self.check_user_permission(event, user)
+
+        # Lock the row and reload the counters so save() cannot overwrite concurrent seat reservations
+        locked = Event.objects.select_for_update().only(*Event.objects.COUNTER_FIELDS).get(pk=event.pk)
+        for field in Event.objects.COUNTER_FIELDS:
+            setattr(event, field, getattr(locked, field))
              
         for key, value in data.items():
             setattr(event, key, value)
+        if 'capacity' in data:
+            taken = event.registrations.exclude(status='cancelled').count()
+            event.seats_remaining = max(event.capacity - taken, 0)
         event.save()
+        if 'capacity' in data:
+            WaitlistService().promote(event.id)
+        EventSearchCacheService.bump_generation()
+        EventDetailCacheService.invalidate(event.id)
 
         return event
     
     def delete_event(self, event: Event, user: User) -> Result:
             self.check_user_permission(event, user)
             
+            event_id = event.id
             event.delete()
+            EventSearchCacheService.bump_generation()
+            EventDetailCacheService.invalidate(event_id)
 
     def toggle_favorite(self, event: Event, user: User) -> Result:
-        if event.favorites.filter(id=user.id).exists():
-            event.favorites.remove(user)
-            return "Event removed from favorites"
-        else:
-            event.favorites.add(user)
+        favorites = WriteBehindService.event_favorites
+        if favorites is None:
+            return self.__toggle_favorite_now(event, user)
+
+        added = favorites.toggle(event.id, user.id)
+        # Buffered state is already visible through is_favorited, so validators must change now
+        EventDetailCacheService.invalidate(event.id)
+        if added:
+            self.feed_service.record(user.id, event.id, 'favorited')
             return "Event added to favorites"
+        self.feed_service.retract(user.id, event.id, 'favorited')
+        return "Event removed from favorites"
+
+    @transaction.atomic
+    def __toggle_favorite_now(self, event: Event, user: User) -> Result:
+        EventDetailCacheService.invalidate(event.id)
+        favorites = Event.favorites.through.objects
+
+        removed, _ = favorites.filter(event_id=event.id, user_id=user.id).delete()
+        if removed:
+            Event.objects.adjust_counters(event.id, favorites_count=-removed)
+            self.feed_service.retract(user.id, event.id, 'favorited')
+            return "Event removed from favorites"
+
+        _, created = favorites.get_or_create(event_id=event.id, user_id=user.id)
+        if created:
+            Event.objects.adjust_counters(event.id, favorites_count=1)
+            self.feed_service.record(user.id, event.id, 'favorited')
+        return "Event added to favorites"
 
 
     def get_event_registrations(self, event: Event) -> Result:
-            return event.registrations.all()
+            return event.registrations.prefetch_related(User.objects.prefetch_with_follow_counts('attendee'))
+
+    def can_export_registrations(self, event: Event, user: User) -> bool:
+        return event.organizer_id == user.id or user.is_staff
+
+    def export_registrations(self, event: Event, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+        """
+        Streams the event's registrations as flat rows joined with their attendee.
+        Rows come from a server-side iterator, so memory stays flat whatever the attendee count.
+        """
+        return (
+            Registration.objects
+            .filter(event=event)
+            .order_by('id')
+            .values(*REGISTRATION_EXPORT_FIELDS, **{
+                column: F(f"attendee__{field}") for column, field in ATTENDEE_EXPORT_FIELDS.items()
+            })
+            .iterator(chunk_size=chunk_size)
+        )
             
\ No newline at end of file
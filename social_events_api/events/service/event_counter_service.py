@@ -0,0 +1,52 @@
+from typing import Dict, Iterator
+from django.db import transaction
+from ..models import Comment, Event, Registration
+from ..utils.query import count_subquery
+
+
+class EventCounterService:
+    """
+    Recomputes the denormalized Event counters and remaining seats from their source tables
+    and repairs rows that drifted, e.g. after writes that bypassed the services.
+    """
+    DEFAULT_CHUNK_SIZE = 500
+
+    def actual_counts(self, queryset):
+        return queryset.annotate(
+            actual_comments=count_subquery(Comment.objects.all(), 'event_id'),
+            actual_registrations=count_subquery(Registration.objects.filter(status='confirmed'), 'event_id'),
+            actual_favorites=count_subquery(Event.favorites.through.objects.all(), 'event_id'),
+            actual_taken_seats=count_subquery(Registration.objects.exclude(status='cancelled'), 'event_id'),
+        )
+
+    def reconcile(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict[str, int]]:
+        """Walks the events table by primary key, one transaction per chunk, yielding progress per chunk"""
+        last_id = 0
+        while True:
+            with transaction.atomic():
+                events = list(
+                    self.actual_counts(Event.objects.select_for_update().filter(id__gt=last_id))
+                    .order_by('id')
+                    .only('id', 'capacity', *Event.objects.COUNTER_FIELDS)[:chunk_size]
+                )
+                if not events:
+                    return
+
+                drifted = [event for event in events if self._apply_actual_counts(event)]
+                if drifted:
+                    Event.objects.bulk_update(drifted, Event.objects.COUNTER_FIELDS)
+
+            last_id = events[-1].id
+            yield {'checked': len(events), 'fixed': len(drifted), 'last_id': last_id}
+
+    def _apply_actual_counts(self, event: Event) -> bool:
+        actual = {
+            'comments_count': event.actual_comments,
+            'confirmed_registrations_count': event.actual_registrations,
+            'favorites_count': event.actual_favorites,
+            'seats_remaining': max(event.capacity - event.actual_taken_seats, 0),
+        }
+        drifted = any(getattr(event, field) != value for field, value in actual.items())
+        for field, value in actual.items():
+            setattr(event, field, value)
+        return drifted
@@ -1,21 +1,29 @@
 from django.utils import timezone
 from ..models import Event
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from ..utils.result import Result
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db.models import Q, QuerySet
 from ..models import User
 from rest_framework.exceptions import NotFound
 from ..utils.filter import EventQueryBuilder
+from ..utils.geo import haversine_km
+from .write_behind_service import WriteBehindService
 
 
 class EventQueryService:
-    def get_event_by_id_or_slug(self, identifier: str) -> Event:
+    def get_events(self, user = None) -> QuerySet:
+        """All events with the relations and annotations EventSerializer reads"""
+        return EventQueryBuilder(Event.objects.all()).apply_read_annotations(user).build()
+
+    def get_event_by_id_or_slug(self, identifier: str, user = None) -> Event:
+        events = EventQueryBuilder(Event.objects.all()).apply_read_annotations(user).build()
+
         event = None
         if identifier.isdigit():
-            event = Event.objects.filter(id=identifier).first()
+            event = events.filter(id=identifier).first()
         else:
-            event = Event.objects.filter(slug=identifier).first()
+            event = events.filter(slug=identifier).first()
 
         if not event:
             raise NotFound(detail="Event not found")
@@ -27,12 +35,52 @@ class EventQueryService:
         self,
         search_query: Optional[str] = None,
         filters: Optional[Dict[str, Any]] = None,
-        user = None
+        user = None,
+        fields: Optional[List[str]] = None,
+        expand: Optional[List[str]] = None
     ) -> QuerySet:
         return (
             EventQueryBuilder(Event.objects.all())
             .apply_base_filters(user)
             .apply_search(search_query)
             .apply_filters(filters, user)
+            .apply_read_annotations(user, fields, expand)
             .build()
-        )
\ No newline at end of file
+        )
+
+    def is_favorited(self, event_id: int, user) -> bool:
+        if not user or not user.is_authenticated:
+            return False
+        if WriteBehindService.event_favorites is not None:
+            pending = WriteBehindService.event_favorites.pending_state(event_id, user.id)
+            if pending is not None:
+                return pending
+        return Event.favorites.through.objects.filter(event_id=event_id, user_id=user.id).exists()
+
+    def apply_pending_favorites(self, rows: List[Dict[str, Any]], user) -> List[Dict[str, Any]]:
+        """Overlays the favorite toggles still buffered in this process on serialized is_favorited flags"""
+        favorites = WriteBehindService.event_favorites
+        if favorites is None or not user or not user.is_authenticated:
+            return rows
+
+        states = favorites.pending_states((row['id'] for row in rows if 'is_favorited' in row), user.id)
+        for row in rows:
+            if row['id'] in states:
+                row['is_favorited'] = states[row['id']]
+        return rows
+
+    def rank_by_distance(
+        self,
+        events: QuerySet,
+        latitude: float,
+        longitude: float,
+        radius_km: float
+    ) -> List[Tuple[float, int]]:
+        """Exact haversine filter over the geohash-pruned candidates, as (distance_km, event_id) sorted nearest first"""
+        ranked = []
+        for event_id, event_latitude, event_longitude in events.order_by().values_list('id', 'latitude', 'longitude'):
+            distance = haversine_km(latitude, longitude, event_latitude, event_longitude)
+            if distance <= radius_km:
+                ranked.append((distance, event_id))
+        ranked.sort()
+        return ranked
@@ -0,0 +1,125 @@
+import re
+from functools import lru_cache
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Func, Q, QuerySet, FloatField, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from ..models import Event
+
+
+class EventSearchBackend:
+    """
+    Interface for the full-text backends used by event search.
+    Backends receive every Event write so they can keep their index in sync.
+    """
+    def filter(self, queryset: QuerySet, search_query: str) -> QuerySet:
+        raise NotImplementedError
+
+    def order_by_relevance(self, queryset: QuerySet, search_query: str) -> QuerySet:
+        raise NotImplementedError
+
+    def index_event(self, event: Event) -> None:
+        pass
+
+    def remove_event(self, event_id: int) -> None:
+        pass
+
+    def rebuild(self) -> int:
+        return 0
+
+
+class IcontainsSearchBackend(EventSearchBackend):
+    """Fallback backend for databases without a full-text index; scans the text columns"""
+    def filter(self, queryset: QuerySet, search_query: str) -> QuerySet:
+        search_filters = Q(title__icontains=search_query) | \
+                       Q(description__icontains=search_query) | \
+                       Q(location__icontains=search_query) | \
+                       Q(venue__icontains=search_query)
+        return queryset.filter(search_filters)
+
+    def order_by_relevance(self, queryset: QuerySet, search_query: str) -> QuerySet:
+        return queryset.order_by('-start_date')
+
+
+class SqliteFtsSearchBackend(EventSearchBackend):
+    """
+    Inverted index kept in an SQLite FTS5 shadow table whose rowid is the event id.
+    Matches are ranked with BM25, weighting the title above the other columns.
+    """
+    TABLE_NAME = 'events_event_fts'
+    COLUMNS = ('title', 'description', 'location', 'venue')
+    COLUMN_WEIGHTS = (10.0, 1.0, 3.0, 3.0)
+    TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+    def filter(self, queryset: QuerySet, search_query: str) -> QuerySet:
+        match = self.build_match_expression(search_query)
+        if not match:
+            return queryset.none()
+
+        matching_ids = RawSQL(
+            f'SELECT rowid FROM {self.TABLE_NAME} WHERE {self.TABLE_NAME} MATCH %s',
+            (match,)
+        )
+        return queryset.filter(id__in=matching_ids)
+
+    def order_by_relevance(self, queryset: QuerySet, search_query: str) -> QuerySet:
+        match = self.build_match_expression(search_query)
+        if not match:
+            return queryset
+
+        weights = ', '.join(str(weight) for weight in self.COLUMN_WEIGHTS)
+        rank = Func(
+            Value(match), F('pk'),
+            template=(
+                f'(SELECT bm25({self.TABLE_NAME}, {weights}) FROM {self.TABLE_NAME} '
+                f'WHERE {self.TABLE_NAME} MATCH %(expressions)s)'
+            ),
+            arg_joiner=' AND rowid = ',
+            output_field=FloatField()
+        )
+        # BM25 scores are negative in FTS5, lower means more relevant
+        return queryset.annotate(search_rank=rank).order_by('search_rank', '-start_date')
+
+    def build_match_expression(self, search_query: str) -> str:
+        """Quotes each word as a prefix term so user input never reaches the FTS5 query syntax"""
+        tokens = self.TOKEN_PATTERN.findall(search_query or '')
+        return ' '.join(f'"{token}"*' for token in tokens)
+
+    def index_event(self, event: Event) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.TABLE_NAME} WHERE rowid = %s', [event.pk])
+            cursor.execute(
+                f'INSERT INTO {self.TABLE_NAME} (rowid, {", ".join(self.COLUMNS)}) VALUES (%s, %s, %s, %s, %s)',
+                [event.pk] + [getattr(event, column) or '' for column in self.COLUMNS]
+            )
+
+    def remove_event(self, event_id: int) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.TABLE_NAME} WHERE rowid = %s', [event_id])
+
+    def rebuild(self) -> int:
+        columns = ', '.join(self.COLUMNS)
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.TABLE_NAME}')
+            cursor.execute(
+                f'INSERT INTO {self.TABLE_NAME} (rowid, {columns}) '
+                f'SELECT id, {columns} FROM {Event._meta.db_table}'
+            )
+            cursor.execute(f'SELECT COUNT(*) FROM {self.TABLE_NAME}')
+            return cursor.fetchone()[0]
+
+
+@lru_cache(maxsize=None)
+def get_search_backend() -> EventSearchBackend:
+    """
+    Returns the backend configured in settings.EVENT_SEARCH_BACKEND,
+    defaulting to FTS5 on SQLite and to column scans elsewhere.
+    """
+    backend_path = getattr(settings, 'EVENT_SEARCH_BACKEND', None)
+    if backend_path:
+        return import_string(backend_path)()
+
+    if connection.vendor == 'sqlite':
+        return SqliteFtsSearchBackend()
+    return IcontainsSearchBackend()
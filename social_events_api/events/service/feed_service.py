@@ -0,0 +1,135 @@
+from typing import Dict, Iterable, List, Set
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, QuerySet, Window
+from django.db.models.functions import RowNumber
+from ..models import Activity, FeedEntry, User, UserFollow
+from .follow_graph_service import FollowGraphService
+
+
+class FeedService:
+    """
+    Hybrid fan-out feed of what followed users do with events. Once its transaction commits, an
+    activity of a regular account is copied into the FeedEntry table of each follower with one bulk
+    insert, and the feeds it landed in are trimmed. Accounts with more than fanout_threshold followers
+    are not copied; their activities are merged in when a feed is read, so a popular account costs one
+    indexed range read instead of a write per follower. Fan-out reads the followers from UserFollow;
+    reads pick the popular accounts from the in-memory follow graph.
+    """
+    _config = getattr(settings, 'ACTIVITY_FEED', {})
+    fanout_threshold = _config.get('FANOUT_THRESHOLD', 1000)
+    max_length = _config.get('MAX_LENGTH', 500)
+    follow_graph = FollowGraphService()
+
+    def record(self, actor_id: int, event_id: int, verb: str) -> None:
+        """Stores the activity and fans it out after commit; repeating an activity is a no-op"""
+        try:
+            with transaction.atomic():
+                activity = Activity.objects.create(actor_id=actor_id, event_id=event_id, verb=verb)
+        except IntegrityError:
+            return
+        transaction.on_commit(lambda: self._fan_out([activity]))
+
+    def record_many(self, actor_ids: List[int], event_id: int, verb: str) -> None:
+        """record() for several actors with one bulk insert and one fan-out"""
+        if not actor_ids:
+            return
+        Activity.objects.bulk_create(
+            [Activity(actor_id=actor_id, event_id=event_id, verb=verb) for actor_id in actor_ids],
+            ignore_conflicts=True
+        )
+        transaction.on_commit(lambda: self._fan_out(list(
+            Activity.objects.filter(actor_id__in=actor_ids, event_id=event_id, verb=verb)
+        )))
+
+    def retract(self, actor_id: int, event_id: int, verb: str) -> None:
+        """Removes the activity, and with it its entries, from every feed"""
+        Activity.objects.filter(actor_id=actor_id, event_id=event_id, verb=verb).delete()
+
+    def unfollowed(self, follower_id: int, following_id: int) -> None:
+        FeedEntry.objects.filter(owner_id=follower_id, activity__actor_id=following_id).delete()
+
+    def get_feed(self, user: User) -> QuerySet:
+        """Activities of the fanned-out feed plus those of followed popular accounts, newest first"""
+        pulled = [
+            actor_id for actor_id in self.follow_graph.following(user.id)
+            if self.fans_out_on_read(actor_id)
+        ]
+        pushed = FeedEntry.objects.filter(owner=user).values('activity_id')
+        return (
+            Activity.objects
+            .filter(Q(pk__in=pushed) | Q(actor_id__in=pulled))
+            .filter(event__status='published', event__is_private=False)
+            .select_related('actor', 'event', 'event__category')
+        )
+
+    def fans_out_on_read(self, actor_id: int) -> bool:
+        return len(self.follow_graph.followers(actor_id)) > self.fanout_threshold
+
+    def _fan_out(self, activities: List[Activity]) -> None:
+        if len(activities) == 1:
+            actor_id = activities[0].actor_id
+            followers = list(
+                UserFollow.objects.filter(following_id=actor_id)
+                .order_by()
+                .values_list('follower_id', flat=True)[:self.fanout_threshold + 1]
+            )
+            followers_of = {actor_id: followers} if len(followers) <= self.fanout_threshold else {}
+        else:
+            followers_of = self._followers_of_regular_accounts({activity.actor_id for activity in activities})
+
+        entries = [
+            FeedEntry(owner_id=follower_id, activity_id=activity.id, created_at=activity.created_at)
+            for activity in activities
+            for follower_id in followers_of.get(activity.actor_id, ())
+        ]
+        if not entries:
+            return
+        try:
+            with transaction.atomic():
+                FeedEntry.objects.bulk_create(entries, batch_size=1000, ignore_conflicts=True)
+                self.trim({entry.owner_id for entry in entries})
+        except IntegrityError:
+            # The activity was retracted before its fan-out ran
+            pass
+
+    def _followers_of_regular_accounts(self, actor_ids: Set[int]) -> Dict[int, List[int]]:
+        """Followers of each actor with at most fanout_threshold of them, in two queries"""
+        follows = UserFollow.objects.filter(following_id__in=actor_ids).order_by()
+        popular = set(
+            follows.values('following_id').annotate(followers=Count('id'))
+            .filter(followers__gt=self.fanout_threshold).values_list('following_id', flat=True)
+        )
+        followers_of: Dict[int, List[int]] = {}
+        for follower_id, following_id in follows.exclude(following_id__in=popular).values_list('follower_id', 'following_id'):
+            followers_of.setdefault(following_id, []).append(follower_id)
+        return followers_of
+
+    @classmethod
+    def trim(cls, owner_ids: Iterable[int]) -> int:
+        """Deletes the entries of the given feeds past their max_length newest, returning how many"""
+        overflowing = list(
+            FeedEntry.objects
+            .filter(owner_id__in=owner_ids)
+            .order_by()
+            .values('owner_id')
+            .annotate(entries=Count('id'))
+            .filter(entries__gt=cls.max_length)
+            .values_list('owner_id', flat=True)
+        )
+        if not overflowing:
+            return 0
+
+        stale = (
+            FeedEntry.objects
+            .filter(owner_id__in=overflowing)
+            .annotate(rank=Window(
+                RowNumber(),
+                partition_by=[F('owner_id')],
+                order_by=[F('created_at').desc(), F('id').desc()]
+            ))
+            .filter(rank__gt=cls.max_length)
+            .values_list('id', flat=True)
+        )
+        deleted, _ = FeedEntry.objects.filter(pk__in=list(stale)).delete()
+        return deleted
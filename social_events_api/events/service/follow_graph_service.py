@@ -0,0 +1,90 @@
+import threading
+import time
+from array import array
+from typing import List, Optional
+from django.conf import settings
+from django.db import transaction
+from django.db.models import QuerySet
+from ..models import Registration, User, UserFollow
+from ..utils.cache import GenerationCounter
+from ..utils.follow_graph import FollowGraph, intersect
+
+FOLLOW_GRAPH_GENERATION = GenerationCounter('follow-graph')
+
+
+class FollowGraphService:
+    """
+    Answers follow-graph questions from an in-process copy of UserFollow instead of self-joins.
+    Follows made by this process are applied incrementally once committed; the shared generation
+    tells each process when another one changed the graph, and the copy is then reloaded on the next read.
+    Copies older than max_age seconds are reloaded as well, catching UserFollow rows changed without
+    a bump (admin edits, cascades of deleted users) and bumps that raced on a non-atomic cache.
+    """
+    max_age = getattr(settings, 'FOLLOW_GRAPH', {}).get('MAX_AGE', 300)
+    graph = FollowGraph()
+    _generation: Optional[int] = None
+    _loaded_at = 0.0
+    _sync_lock = threading.Lock()
+
+    def followed(self, follower_id: int, following_id: int) -> None:
+        transaction.on_commit(lambda: self._apply(self.graph.add, follower_id, following_id))
+
+    def unfollowed(self, follower_id: int, following_id: int) -> None:
+        transaction.on_commit(lambda: self._apply(self.graph.remove, follower_id, following_id))
+
+    def following(self, user_id: int) -> array:
+        """Sorted ids of the users `user_id` follows"""
+        return self._current().following(user_id)
+
+    def followers(self, user_id: int) -> array:
+        """Sorted ids of the users following `user_id`"""
+        return self._current().followers(user_id)
+
+    def friends_attending(self, event_id: int, user: User) -> List[int]:
+        """Ids of the users `user` follows who hold a registration for the event"""
+        following = self._current().following(user.id)
+        if not following:
+            return []
+        attendees = array('q', (
+            Registration.objects
+            .filter(event_id=event_id)
+            .exclude(status='cancelled')
+            .order_by('attendee_id')
+            .values_list('attendee_id', flat=True)
+        ))
+        return intersect(following, attendees)
+
+    def mutual(self, user: User, other_id: int) -> List[int]:
+        """Ids of the users `user` follows who also follow `other_id`"""
+        graph = self._current()
+        return intersect(graph.following(user.id), graph.followers(other_id))
+
+    def get_users(self, user_ids: List[int]) -> QuerySet:
+        return User.objects.with_follow_counts().filter(pk__in=user_ids).order_by('username')
+
+    def _current(self) -> FollowGraph:
+        cls = type(self)
+        generation = FOLLOW_GRAPH_GENERATION.get()
+        if cls._is_stale(generation):
+            with cls._sync_lock:
+                if cls._is_stale(generation):
+                    cls.graph.load(
+                        UserFollow.objects.order_by().values_list('follower_id', 'following_id').iterator(chunk_size=10000)
+                    )
+                    cls._generation = generation
+                    cls._loaded_at = time.monotonic()
+        return cls.graph
+
+    @classmethod
+    def _is_stale(cls, generation: int) -> bool:
+        return generation != cls._generation or time.monotonic() - cls._loaded_at > cls.max_age
+
+    @classmethod
+    def _apply(cls, change, follower_id: int, following_id: int) -> None:
+        # Serialized with reloads, so a reload that read the table before this commit cannot drop the change
+        with cls._sync_lock:
+            change(follower_id, following_id)
+            generation = FOLLOW_GRAPH_GENERATION.bump()
+            # Only this change happened since the copy was current; otherwise leave it stale
+            if cls._generation is not None and generation == cls._generation + 1:
+                cls._generation = generation
@@ -0,0 +1,186 @@
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+from ..models import Event, Recommendation, Registration, User
+from .follow_graph_service import FollowGraphService
+
+DEFAULT_WEIGHTS = {
+    'category': 1.0,
+    'followee_registrations': 0.8,
+    'followee_favorites': 0.4,
+    'popularity': 0.3,
+    'recency': 0.2,
+}
+
+
+class _Candidates:
+    """Upcoming events as parallel arrays, plus who registered for or favorited them sorted by user id"""
+    def __init__(self, rows: List[Tuple], now: datetime, recency_days: float):
+        self.event_ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self.organizer_ids = np.array([row[2] for row in rows], dtype=np.int64)
+        self.index = {event_id: position for position, event_id in enumerate(self.event_ids.tolist())}
+
+        categories = sorted({row[1] for row in rows if row[1] is not None})
+        self.category_columns = {category_id: column for column, category_id in enumerate(categories)}
+        # Events without a category point at an extra column that no user is interested in
+        self.event_categories = np.array(
+            [self.category_columns.get(row[1], len(categories)) for row in rows], dtype=np.int64
+        )
+
+        engagement = np.log1p(np.array([row[3] + row[4] for row in rows], dtype=np.float32))
+        self.popularity = engagement / engagement.max() if rows and engagement.max() > 0 else engagement
+        age_days = (now.timestamp() - np.array([row[5].timestamp() for row in rows], dtype=np.float64)) / 86400
+        self.recency = np.exp(-np.maximum(age_days, 0) / recency_days).astype(np.float32)
+
+        self.registrations = self._by_user(
+            Registration.objects.filter(event_id__in=self.index).exclude(status='cancelled')
+            .values_list('attendee_id', 'event_id')
+        )
+        self.favorites = self._by_user(
+            Event.favorites.through.objects.filter(event_id__in=self.index).values_list('user_id', 'event_id')
+        )
+
+    def __len__(self) -> int:
+        return len(self.event_ids)
+
+    def _by_user(self, pairs: QuerySet) -> Tuple[np.ndarray, np.ndarray]:
+        """(user ids, event columns) sorted by user id, so a user's rows are found by binary search"""
+        users, columns = [], []
+        for user_id, event_id in pairs.iterator(chunk_size=10000):
+            users.append(user_id)
+            columns.append(self.index[event_id])
+        users = np.array(users, dtype=np.int64)
+        order = np.argsort(users, kind='stable')
+        return users[order], np.array(columns, dtype=np.int64)[order]
+
+
+class RecommendationService:
+    """
+    Scores every upcoming event for a chunk of users at a time as one users x events matrix and keeps
+    each user's top_k in the Recommendation table, so serving them is a single indexed read.
+    Signals are scaled to [0, 1] and weighted: the event's category is one of the user's interests,
+    how many followees registered for or favorited it, its engagement and how recently it was posted.
+    Events the user organizes or already registered for are never recommended.
+    """
+    _config = getattr(settings, 'EVENT_RECOMMENDATIONS', {})
+    top_k = _config.get('TOP_K', 20)
+    user_chunk_size = _config.get('USER_CHUNK_SIZE', 1000)
+    max_candidates = _config.get('MAX_CANDIDATES', 5000)
+    recency_days = _config.get('RECENCY_DAYS', 14)
+    weights = {**DEFAULT_WEIGHTS, **_config.get('WEIGHTS', {})}
+    follow_graph = FollowGraphService()
+
+    def get_for_user(self, user: User) -> QuerySet:
+        return (
+            Recommendation.objects
+            .filter(user=user, event__status='published', event__start_date__gt=timezone.now())
+            .select_related('event', 'event__category')
+        )
+
+    def compute(self, chunk_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Rebuilds the recommendations of every active user, yielding progress after each chunk"""
+        chunk_size = chunk_size or self.user_chunk_size
+        now = timezone.now()
+        candidates = _Candidates(self._candidate_rows(now), now, self.recency_days)
+
+        last_id = 0
+        while True:
+            user_ids = list(
+                User.objects.filter(is_active=True, pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:chunk_size]
+            )
+            if not user_ids:
+                break
+            last_id = user_ids[-1]
+
+            users = np.array(user_ids, dtype=np.int64)
+            recommendations = self._recommend(users, candidates, now) if len(candidates) else []
+            with transaction.atomic():
+                Recommendation.objects.filter(user_id__in=user_ids).delete()
+                Recommendation.objects.bulk_create(recommendations, batch_size=1000)
+            yield {'users': len(user_ids), 'recommendations': len(recommendations), 'last_id': last_id}
+
+    def _candidate_rows(self, now: datetime) -> List[Tuple]:
+        return list(
+            Event.objects
+            .filter(status='published', is_private=False, start_date__gt=now, seats_remaining__gt=0)
+            .order_by('start_date')
+            .values_list(
+                'id', 'category_id', 'organizer_id', 'confirmed_registrations_count', 'favorites_count', 'created_at'
+            )[:self.max_candidates]
+        )
+
+    def _recommend(self, users: np.ndarray, candidates: _Candidates, now: datetime) -> List[Recommendation]:
+        scores = self._score(users, candidates)
+        k = min(self.top_k, len(candidates))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top = np.take_along_axis(top, np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1), axis=1)
+
+        recommendations = []
+        for row, user_id in enumerate(users.tolist()):
+            for rank, column in enumerate(top[row].tolist(), start=1):
+                score = float(scores[row, column])
+                if score == -np.inf:
+                    break
+                recommendations.append(Recommendation(
+                    user_id=user_id,
+                    event_id=int(candidates.event_ids[column]),
+                    rank=rank,
+                    score=round(score, 6),
+                    computed_at=now
+                ))
+        return recommendations
+
+    def _score(self, users: np.ndarray, candidates: _Candidates) -> np.ndarray:
+        weights = self.weights
+        interests = np.zeros((len(users), len(candidates.category_columns) + 1), dtype=np.float32)
+        rows = {user_id: row for row, user_id in enumerate(users.tolist())}
+        for user_id, category_id in User.interests.through.objects.filter(
+            user_id__in=rows, category_id__in=candidates.category_columns
+        ).values_list('user_id', 'category_id'):
+            interests[rows[user_id], candidates.category_columns[category_id]] = 1
+
+        followee_rows, followees = self._followees(users)
+        registered = self._counts(followee_rows, followees, candidates.registrations, len(users), len(candidates))
+        favorited = self._counts(followee_rows, followees, candidates.favorites, len(users), len(candidates))
+
+        scores = (
+            weights['category'] * interests[:, candidates.event_categories]
+            + weights['followee_registrations'] * registered / (registered + 1)
+            + weights['followee_favorites'] * favorited / (favorited + 1)
+            + weights['popularity'] * candidates.popularity
+            + weights['recency'] * candidates.recency
+        )
+
+        own = self._counts(np.arange(len(users)), users, candidates.registrations, len(users), len(candidates))
+        scores[own > 0] = -np.inf
+        scores[users[:, None] == candidates.organizer_ids[None, :]] = -np.inf
+        return scores
+
+    def _followees(self, users: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Every (user row, followee id) pair of the chunk, read from the in-memory follow graph"""
+        following = [self.follow_graph.following(user_id) for user_id in users.tolist()]
+        sizes = np.array([len(ids) for ids in following], dtype=np.int64)
+        if not sizes.sum():
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        followees = np.concatenate([np.frombuffer(ids, dtype=np.int64) for ids in following if len(ids)])
+        return np.repeat(np.arange(len(users)), sizes), followees
+
+    @staticmethod
+    def _counts(rows: np.ndarray, actors: np.ndarray, actions: Tuple[np.ndarray, np.ndarray], height: int, width: int) -> np.ndarray:
+        """height x width matrix counting, per row, the actions of the actors listed for that row"""
+        action_users, action_columns = actions
+        starts = np.searchsorted(action_users, actors, side='left')
+        lengths = np.searchsorted(action_users, actors, side='right') - starts
+        total = int(lengths.sum())
+        if not total:
+            return np.zeros((height, width), dtype=np.float32)
+
+        # Expand each (row, actor) pair into the positions of that actor's actions
+        offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        positions = np.repeat(starts, lengths) + offsets
+        cells = np.repeat(rows, lengths) * width + action_columns[positions]
+        return np.bincount(cells, minlength=height * width).reshape(height, width).astype(np.float32)
@@ -1,41 +1,156 @@
-from ..models import Registration, User, Event
+from typing import Any, Dict, List, Optional
+from ..models import Registration, User, Event, WaitlistEntry
 from ..utils.result import Result
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+from .event_cache_service import EventDetailCacheService
+from .feed_service import FeedService
+from .checkin_service import CheckInService
+from .waitlist_service import WaitlistService
 
 class RegistrationService:
+    EVENT_FULL = "The event has reached its maximum capacity."
+    waitlist_service = WaitlistService()
+    checkin_service = CheckInService()
+    feed_service = FeedService()
+
+    def can_register_group(self, event: Event, user: User) -> bool:
+        return event.organizer_id == user.id or user.is_staff
 
     def validate_authority(self, registration :  Registration, user: User):
        if registration.attendee != user:
             raise ValidationError("Not allowed to make this action") 
 
     def validate_creation(self, data : dict):
+        """
+        Cheap checks against the already loaded event. Capacity and duplicates are enforced
+        atomically by create, so this only spares doomed attempts a write.
+        """
         event = data.get('event')
-        attendee = data.get('attendee')
-        
-        is_registration_existing = Registration.objects.filter(attendee=attendee, event=event).exists()
-        if is_registration_existing:
-            return Result.failure("Registration already exists")
     
         if event.status == 'cancelled':
             return Result.failure("Can't make registration of a cancelled event")
 
-        if Registration.objects.filter(event=event, attendee=attendee).exists():
-            return Result.failure("Already registred at the event")
-
-        if event.capacity and event.registrations.count() >= event.capacity:
-            return Result.failure("The event has reached its maximum capacity.")
+        if event.seats_remaining <= 0:
+            return Result.failure(self.EVENT_FULL)
         
         return Result.success()
     
-    def create(self, data) -> Registration:        
-        return Registration.objects.create(**data)
+    def create(self, data) -> Result[Registration]:
+        """
+        Reserves the seat with a conditional UPDATE and inserts the registration in the same
+        transaction, so concurrent attempts can never oversell. A duplicate registration hits
+        the unique constraint and rolls the reservation back with it.
+        """
+        takes_seat = data.get('status', 'pending') != 'cancelled'
+        try:
+            with transaction.atomic():
+                if takes_seat and not Event.objects.reserve_seats(data['event'].id):
+                    return Result.failure(self.EVENT_FULL)
+
+                registration = Registration.objects.create(**data)
+                Event.objects.adjust_counters(
+                    registration.event_id,
+                    confirmed_registrations_count=int(registration.status == 'confirmed')
+                )
+                self.feed_service.record(registration.attendee_id, registration.event_id, 'registered')
+                EventDetailCacheService.invalidate(registration.event_id)
+        except IntegrityError:
+            return Result.failure("Already registred at the event")
+
+        return Result.success(registration)
     
-    def confirm(self, registration : Registration):
+    def get_user_registrations(self, user: User, filters: Optional[Dict[str, Any]] = None) -> QuerySet:
+        """User's registrations joined with their event and category, newest first"""
+        filters = filters or {}
+        registrations = Registration.objects.filter(attendee=user).select_related('event', 'event__category')
+
+        now = timezone.now()
+        if filters.get('upcoming'):
+            registrations = registrations.filter(event__start_date__gt=now)
+        if filters.get('past'):
+            registrations = registrations.filter(event__end_date__lt=now)
+        if filters.get('status'):
+            registrations = registrations.filter(status=filters['status'])
+        return registrations
+
+    def create_group(self, event: Event, attendee_ids: List[int], status: str = 'pending', notes: str = '') -> Result[List[dict]]:
+        """
+        Registers a group in a fixed number of queries: one lookup each for unknown users and
+        existing registrations, one conditional UPDATE reserving the seats of the whole group,
+        and one bulk insert, all in one transaction. Seats are all-or-nothing for the group.
+        Returns one result per requested attendee, in request order.
+        """
+        if event.status == 'cancelled':
+            return Result.failure("Can't make registration of a cancelled event")
+
+        unique_ids = list(dict.fromkeys(attendee_ids))
+        known = set(User.objects.filter(id__in=unique_ids).values_list('id', flat=True))
+        registered = set(
+            Registration.objects.filter(event=event, attendee_id__in=unique_ids).values_list('attendee_id', flat=True)
+        )
+        errors = {}
+        for attendee_id in unique_ids:
+            if attendee_id not in known:
+                errors[attendee_id] = "User not found"
+            elif attendee_id in registered:
+                errors[attendee_id] = "Already registred at the event"
+        to_create = [attendee_id for attendee_id in unique_ids if attendee_id not in errors]
+
+        created = {}
+        if to_create:
+            try:
+                with transaction.atomic():
+                    if not Event.objects.reserve_seats(event.id, len(to_create)):
+                        errors.update({attendee_id: self.EVENT_FULL for attendee_id in to_create})
+                    else:
+                        registrations = Registration.objects.bulk_create([
+                            Registration(event=event, attendee_id=attendee_id, status=status, notes=notes)
+                            for attendee_id in to_create
+                        ])
+                        created = {registration.attendee_id: registration for registration in registrations}
+                        Event.objects.adjust_counters(
+                            event.id,
+                            confirmed_registrations_count=len(registrations) if status == 'confirmed' else 0
+                        )
+                        # Attendees registered here no longer need their place in line
+                        WaitlistEntry.objects.filter(event=event, user_id__in=to_create).delete()
+                        self.feed_service.record_many(to_create, event.id, 'registered')
+                        EventDetailCacheService.invalidate(event.id)
+            except IntegrityError:
+                return Result.failure("Some attendees were registered concurrently, please retry")
+
+        seen = set()
+        results = []
+        for attendee_id in attendee_ids:
+            if attendee_id in seen:
+                results.append({'attendee': attendee_id, 'success': False, 'detail': "Duplicated in the request"})
+                continue
+            seen.add(attendee_id)
+            if attendee_id in created:
+                results.append({'attendee': attendee_id, 'success': True, 'registration': created[attendee_id].id})
+            else:
+                results.append({'attendee': attendee_id, 'success': False, 'detail': errors[attendee_id]})
+        return Result.success(results)
+
+    @transaction.atomic
+    def confirm(self, registration : Registration) -> str:
+        """Confirms the registration and returns its signed check-in token"""
         self.__validate_confirm(registration)
 
+        # Conditional update so concurrent confirmations count the seat only once
+        confirmed = Registration.objects.filter(pk=registration.pk, status='pending').update(status='confirmed')
+        if not confirmed:
+            raise ValidationError("Only pending registrations can be confirmed")
         registration.status = 'confirmed'
-        registration.save()
+        Event.objects.adjust_counters(registration.event_id, confirmed_registrations_count=1)
+        self.checkin_service.restore(registration.id)
+        EventDetailCacheService.invalidate(registration.event_id)
+        return self.checkin_service.issue_token(registration)
     
+    @transaction.atomic
     def cancel(self, registration : Registration):
         if registration.status == 'pending':
             self.__delete_registration(registration)
@@ -43,19 +158,49 @@ class RegistrationService:
             self.__cancel_registration(registration)
         else:
             self.__undo_cancel(registration)
+        EventDetailCacheService.invalidate(registration.event_id)
 
     def __cancel_registration(self, registration):
+        released = Registration.objects.filter(pk=registration.pk, status='confirmed').update(
+            status='pending',
+            cancelled_date=None
+        )
         registration.status = 'pending'
         registration.cancelled_date = None
-        registration.save()
+        Event.objects.adjust_counters(registration.event_id, confirmed_registrations_count=-released)
+        self.checkin_service.revoke(registration.id)
 
     def __undo_cancel(self, registration):
+        if not Event.objects.reserve_seats(registration.event_id):
+            raise ValidationError(self.EVENT_FULL)
         registration.status = 'pending'
         registration.cancelled_date = None
         registration.save()
 
+    @transaction.atomic
+    def delete(self, registration: Registration) -> None:
+        """Removes the registration outright, releasing the seat and counters it held"""
+        self.__delete_registration(registration)
+        EventDetailCacheService.invalidate(registration.event_id)
+
     def __delete_registration(self, registration):
+        # Re-read under lock so a concurrent cancel or delete cannot release the same seat twice
+        locked = Registration.objects.select_for_update().filter(pk=registration.pk).only('status').first()
+        if locked is None:
+            return
+        registration_id = registration.id
         registration.delete()
+        if locked.status == 'cancelled':
+            return
+        Event.objects.adjust_counters(
+            registration.event_id,
+            seats_remaining=1,
+            confirmed_registrations_count=-int(locked.status == 'confirmed')
+        )
+        self.checkin_service.revoke(registration_id)
+        self.feed_service.retract(registration.attendee_id, registration.event_id, 'registered')
+        # The freed seat goes to the head of the waitlist within the same transaction
+        self.waitlist_service.promote(registration.event_id)
 
     def __validate_confirm(self, registration):
         if registration.status != 'pending':
@@ -0,0 +1,73 @@
+from typing import List, Optional
+from django.db import transaction
+from django.db.models import Max
+from ..models import Event, Registration, User, WaitlistEntry
+from ..utils.result import Result
+from .event_cache_service import EventDetailCacheService
+from .feed_service import FeedService
+
+
+class WaitlistService:
+    """
+    FIFO waitlist of full events. Positions only grow within an event, but entries can leave from
+    anywhere in the queue (direct and group registrations, deleted users), so a user's place in line
+    is one plus the entries ahead of them: a range count on the (event, position) unique index.
+    """
+    feed_service = FeedService()
+
+    @transaction.atomic
+    def join(self, event: Event, user: User) -> Result:
+        """
+        Queues the user and returns their WaitlistEntry, or their Registration when a seat
+        freed up in the meantime and they were promoted right away.
+        """
+        # Joins and promotions of the same event are serialized on the event row
+        self.__lock_event(event.id)
+
+        if Registration.objects.filter(event=event, attendee=user).exists():
+            return Result.failure("Already registred at the event")
+
+        entry = WaitlistEntry.objects.filter(event=event, user=user).first()
+        if entry is None:
+            last = WaitlistEntry.objects.filter(event=event).aggregate(last=Max('position'))['last']
+            entry = WaitlistEntry.objects.create(event=event, user=user, position=(last or 0) + 1)
+
+        promoted = self.promote(event.id)
+        registration = next((item for item in promoted if item.attendee_id == user.id), None)
+        return Result.success(registration or entry)
+
+    def get_position(self, event_id: int, user: User) -> Optional[int]:
+        """1-based place in line, None when the user is not waiting for the event"""
+        position = WaitlistEntry.objects.filter(event_id=event_id, user=user).values_list('position', flat=True).first()
+        if position is None:
+            return None
+        return WaitlistEntry.objects.filter(event_id=event_id, position__lt=position).count() + 1
+
+    def promote(self, event_id: int) -> List[Registration]:
+        """
+        Hands every free seat to the head of the waitlist as a pending registration.
+        Must run inside the transaction that freed the seats.
+        """
+        self.__lock_event(event_id)
+        promoted = []
+        while True:
+            head = WaitlistEntry.objects.filter(event_id=event_id).first()
+            if head is None:
+                break
+            if Registration.objects.filter(event_id=event_id, attendee_id=head.user_id).exists():
+                # Registered directly while waiting; the seat goes to the next in line
+                head.delete()
+                continue
+            if not Event.objects.reserve_seats(event_id):
+                break
+            head.delete()
+            promoted.append(Registration.objects.create(event_id=event_id, attendee_id=head.user_id))
+            self.feed_service.record(head.user_id, event_id, 'registered')
+
+        if promoted:
+            EventDetailCacheService.invalidate(event_id)
+        return promoted
+
+    @staticmethod
+    def __lock_event(event_id: int) -> None:
+        Event.objects.select_for_update().only('id').get(pk=event_id)
@@ -0,0 +1,48 @@
+from typing import Optional, Set
+from django.conf import settings
+from ..models import Comment, Event
+from ..utils.query import count_subquery
+from ..utils.write_buffer import ToggleBuffer
+from .event_cache_service import EventCommentsCacheService, EventDetailCacheService
+
+
+def _recount_likes(comment_ids: Set[int]) -> None:
+    comments = Comment.objects.filter(pk__in=comment_ids)
+    comments.update(likes_count=count_subquery(Comment.likes.through.objects.all(), 'comment_id'))
+    for event_id in set(comments.values_list('event_id', flat=True)):
+        EventCommentsCacheService.invalidate(event_id)
+
+
+def _recount_favorites(event_ids: Set[int]) -> None:
+    Event.objects.filter(pk__in=event_ids).update(
+        favorites_count=count_subquery(Event.favorites.through.objects.all(), 'event_id')
+    )
+    for event_id in event_ids:
+        EventDetailCacheService.invalidate(event_id)
+
+
+def _build_buffer(through, object_field: str, after_flush) -> Optional[ToggleBuffer]:
+    config = getattr(settings, 'WRITE_BEHIND_TOGGLES', {})
+    if not config.get('ENABLED', False):
+        return None
+    return ToggleBuffer(
+        through,
+        object_field,
+        'user_id',
+        after_flush=after_flush,
+        max_pending=config.get('MAX_PENDING', 500),
+        flush_interval=config.get('FLUSH_INTERVAL', 1.0)
+    )
+
+
+class WriteBehindService:
+    """
+    Optional write-behind mode for comment likes and event favorites, enabled through
+    settings.WRITE_BEHIND_TOGGLES. Counters are recounted for the touched rows on every flush,
+    so they stay exact whatever collapsed in the buffer. Buffers are per process.
+    """
+    comment_likes = _build_buffer(Comment.likes.through, 'comment_id', _recount_likes)
+    event_favorites = _build_buffer(Event.favorites.through, 'event_id', _recount_favorites)
+
+    def flush(self) -> int:
+        return sum(buffer.flush() for buffer in (self.comment_likes, self.event_favorites) if buffer)
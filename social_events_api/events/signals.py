@@ -0,0 +1,14 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Event
+from .service.event_search_service import get_search_backend
+
+
+@receiver(post_save, sender=Event)
+def index_event_for_search(sender, instance, **kwargs):
+    get_search_backend().index_event(instance)
+
+
+@receiver(post_delete, sender=Event)
+def remove_event_from_search(sender, instance, **kwargs):
+    get_search_backend().remove_event(instance.pk)
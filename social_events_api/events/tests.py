@@ -1,3 +1,132 @@
-from django.test import TestCase
+import random
+import threading
+from collections import Counter
+from datetime import timedelta
+from django.db import DatabaseError, connection
+from django.test import TransactionTestCase
+from django.utils import timezone
+from .models import Category, Comment, Event, Registration, User
+from .service.comment_service import CommentService
+from .service.registration_service import RegistrationService
 
-# Create your tests here.
+
+def create_users(prefix, count):
+    return User.objects.bulk_create([
+        User(
+            email=f"{prefix}-{index}@example.com",
+            username=f"{prefix}-{index}",
+            first_name='Test',
+            last_namne='User'
+        )
+        for index in range(count)
+    ])
+
+
+def create_event(organizer, capacity):
+    category = Category.objects.create(name="Concurrency", created_by=organizer)
+    start = timezone.now() + timedelta(days=1)
+    return Event.objects.create(
+        title="Concurrency event",
+        description="Shared by the threads of a concurrency test",
+        organizer=organizer,
+        category=category,
+        location="Test city",
+        venue="Test hall",
+        start_date=start,
+        end_date=start + timedelta(hours=2),
+        capacity=capacity,
+        status='published',
+    )
+
+
+def run_threads(worker, plans):
+    """Runs worker(plan) for each plan on its own thread and connection, all released at once"""
+    start = threading.Barrier(len(plans))
+
+    def run(plan):
+        start.wait()
+        try:
+            worker(plan)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=run, args=(plan,)) for plan in plans]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+class CommentLikeConcurrencyTest(TransactionTestCase):
+    """Committed transactions on a file-backed test database, so the threads really race"""
+    threads = 8
+    toggles = 25
+
+    def setUp(self):
+        self.users = create_users('liker', 10)
+        event = create_event(self.users[0], capacity=100)
+        self.comment = Comment.objects.create(event=event, author=self.users[0], content="Like me")
+
+    def test_concurrent_toggles_keep_likes_count_in_sync(self):
+        rng = random.Random(13)
+        plans = [[rng.choice(self.users) for _ in range(self.toggles)] for _ in range(self.threads)]
+        applied = Counter()
+        lock = threading.Lock()
+
+        def toggle(plan):
+            service = CommentService()
+            for user in plan:
+                try:
+                    service.like(self.comment, user)
+                except DatabaseError:
+                    # The toggle rolled back as a whole, so it simply did not happen
+                    continue
+                with lock:
+                    applied[user.pk] += 1
+
+        run_threads(toggle, plans)
+
+        # Toggles commute, so each user ends up liking the comment iff they toggled an odd number of times
+        expected = {user_id for user_id, toggles in applied.items() if toggles % 2}
+        self.comment.refresh_from_db(fields=['likes_count'])
+        self.assertTrue(applied)
+        self.assertEqual(set(self.comment.likes.values_list('id', flat=True)), expected)
+        self.assertEqual(self.comment.likes_count, len(expected))
+
+
+class RegistrationConcurrencyTest(TransactionTestCase):
+    """A ticket release: more attendees than seats register for one event at the same time"""
+    capacity = 10
+    threads = 8
+
+    def setUp(self):
+        self.users = create_users('attendee', 40)
+        self.event = create_event(self.users[0], capacity=self.capacity)
+
+    def test_concurrent_registrations_never_oversell(self):
+        outcomes = Counter()
+        lock = threading.Lock()
+
+        def register(attendees):
+            service = RegistrationService()
+            for attendee in attendees:
+                # Each attempt sees the event as loaded by the request, like the API does
+                data = {'event': Event.objects.get(pk=self.event.pk), 'attendee': attendee}
+                try:
+                    validation = service.validate_creation(data)
+                    result = service.create(data) if validation.success else validation
+                    outcome = 'registered' if result.success else 'rejected'
+                except DatabaseError:
+                    outcome = 'failed'
+                with lock:
+                    outcomes[outcome] += 1
+
+        run_threads(register, [self.users[index::self.threads] for index in range(self.threads)])
+
+        self.event.refresh_from_db(fields=['seats_remaining'])
+        stored = Registration.objects.filter(event=self.event).exclude(status='cancelled').count()
+        self.assertLessEqual(stored, self.capacity)
+        self.assertEqual(stored, outcomes['registered'])
+        self.assertEqual(stored + self.event.seats_remaining, self.capacity)
+        if not outcomes['failed']:
+            self.assertEqual(stored, self.capacity)
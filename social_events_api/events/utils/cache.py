@@ -0,0 +1,117 @@
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+
+
+class TTLCache:
+    """
+    Thread-safe in-process LRU cache whose entries also expire after a fixed TTL.
+    Keeps hit/miss/eviction counters so the size and TTL can be tuned from real traffic.
+    """
+    def __init__(self, max_entries: int = 1024, ttl: float = 60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+
+class GenerationCounter:
+    """
+    Version number kept in the 'generations' cache alias, which all processes share (see settings).
+    Cache keys embed the current generation; bumping it orphans all older entries at once.
+    Backends with an atomic incr (Redis, LocMemCache) count up by one. Others, such as the database
+    cache, implement incr as a read then a write that can lose a concurrent bump, so there a bump
+    stores a fresh random-suffixed clock value instead: every bump still changes the generation.
+    Seeded from the clock so a counter lost to cache eviction never reuses an old value.
+    """
+    alias = 'generations'
+
+    def __init__(self, name: str):
+        self.key = f"generation:{name}"
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get(self) -> int:
+        cache = self.cache
+        generation = cache.get(self.key)
+        if generation is None:
+            cache.add(self.key, self._seed(), timeout=None)
+            generation = cache.get(self.key, 0)
+        return generation
+
+    def bump(self) -> int:
+        cache = self.cache
+        if isinstance(cache, (RedisCache, LocMemCache)):
+            try:
+                return cache.incr(self.key)
+            except ValueError:
+                cache.add(self.key, self._seed(), timeout=None)
+                return cache.incr(self.key)
+
+        generation = self._seed()
+        cache.set(self.key, generation, timeout=None)
+        return generation
+
+    @staticmethod
+    def _seed() -> int:
+        # Microseconds with a random suffix, so processes bumping at the same time pick distinct values
+        return time.time_ns() // 1000 * 1000 + random.randrange(1000)
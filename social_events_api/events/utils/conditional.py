@@ -0,0 +1,18 @@
+from typing import Optional
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+
+
+def not_modified_response(request, etag: Optional[str]) -> Optional[HttpResponse]:
+    """304 (or 412 for If-Match) when the request's validators match etag, None when the view should render"""
+    if etag is None:
+        return None
+    return get_conditional_response(request, etag=etag)
+
+
+def set_validators(response, etag: str):
+    """Lets clients revalidate the response with If-None-Match on every poll"""
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Authorization',))
+    return response
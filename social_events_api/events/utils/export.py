@@ -0,0 +1,32 @@
+import csv
+import json
+from typing import Any, Dict, Iterable, Iterator, List
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+class _Echo:
+    """File-like object whose write returns the line instead of buffering it"""
+    def write(self, value: str) -> str:
+        return value
+
+
+def csv_lines(rows: Iterable[Dict[str, Any]], columns: List[str]) -> Iterator[str]:
+    """Yields the header and one CSV line per row, never holding more than one row"""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([_csv_value(row[column]) for column in columns])
+
+
+def ndjson_lines(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    encoder = DjangoJSONEncoder()
+    for row in rows:
+        yield encoder.encode(row) + '\n'
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
@@ -1,7 +1,10 @@
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List, Optional
 from django.utils.dateparse import parse_datetime
-from django.db.models import Q, QuerySet
+from django.db.models import Q, QuerySet, Exists, OuterRef, Value, BooleanField
 from django.utils import timezone
+from ..models import Event, User
+from ..service.event_search_service import get_search_backend
+from .geo import covering_prefixes, prefix_upper_bound
 
 class EventFilterBuilder:
     def __init__(self, request=None):
@@ -15,6 +18,7 @@ class EventFilterBuilder:
         self._parse_numeric_filters(request)
         self._parse_boolean_filters(request)
         self._parse_basic_filters(request)
+        self._parse_geo_filters(request)
         
     def _parse_date_filters(self, request) -> None:
         if date_from := request.query_params.get('date_from'):
@@ -39,13 +43,38 @@ class EventFilterBuilder:
             if value := request.query_params.get(param):
                 self.filters[param] = value
 
+    DEFAULT_RADIUS_KM = 10.0
+    MAX_RADIUS_KM = 500.0
+
+    def _parse_geo_filters(self, request) -> None:
+        """Parses near=lat,lng and radius_km=; malformed coordinates are ignored"""
+        near = request.query_params.get('near')
+        if not near:
+            return
+        try:
+            latitude, longitude = (float(value) for value in near.split(','))
+            radius_km = float(request.query_params.get('radius_km', self.DEFAULT_RADIUS_KM))
+        except ValueError:
+            return
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180) or radius_km <= 0:
+            return
+
+        self.filters['near'] = (latitude, longitude)
+        self.filters['radius_km'] = min(radius_km, self.MAX_RADIUS_KM)
+
     def get_filters(self) -> Dict[str, Any]:
         return self.filters
 
 
 class EventQueryBuilder:
+    ORDERING_FIELDS = {'start_date', 'end_date', 'created_at', 'price', 'title'}
+    DEFAULT_ORDERING = '-start_date'
+    RELATION_FIELDS = ('organizer', 'category')
+    SERIALIZER_COLUMNS = {'registrations_count': 'confirmed_registrations_count'}
+
     def __init__(self, queryset: QuerySet):
         self.queryset = queryset
+        self.search_query = None
 
     def apply_base_filters(self, user=None) -> 'EventQueryBuilder':
         base_filters = Q(is_private=False)
@@ -56,11 +85,8 @@ class EventQueryBuilder:
 
     def apply_search(self, search_query: str) -> 'EventQueryBuilder':
         if search_query:
-            search_filters = Q(title__icontains=search_query) | \
-                           Q(description__icontains=search_query) | \
-                           Q(location__icontains=search_query) | \
-                           Q(venue__icontains=search_query)
-            self.queryset = self.queryset.filter(search_filters)
+            self.search_query = search_query
+            self.queryset = get_search_backend().filter(self.queryset, search_query)
         return self
 
     def apply_filters(self, filters: Dict[str, Any], user=None) -> 'EventQueryBuilder':
@@ -70,6 +96,7 @@ class EventQueryBuilder:
         self._apply_basic_filters(filters)
         self._apply_availability_filter(filters)
         self._apply_favorites_filter(filters, user)
+        self._apply_geo_filter(filters)
         self._apply_ordering(filters)
         return self
 
@@ -91,19 +118,92 @@ class EventQueryBuilder:
 
     def _apply_availability_filter(self, filters: Dict[str, Any]) -> None:
         if filters.get('available_only'):
+            # Matches the (status, start_date, seats_remaining) index
             self.queryset = self.queryset.filter(
-                capacity__gt=0,
+                status='published',
                 start_date__gt=timezone.now(),
-                status='published'
+                seats_remaining__gt=0
             )
 
     def _apply_favorites_filter(self, filters: Dict[str, Any], user) -> None:
         if filters.get('favorites_only') and user and user.is_authenticated:
             self.queryset = self.queryset.filter(favorites=user)
 
+    def _apply_geo_filter(self, filters: Dict[str, Any]) -> None:
+        """Coarse pruning to the geohash cells around the point; exact distances are computed afterwards"""
+        if not (near := filters.get('near')):
+            return
+
+        cells = Q()
+        for prefix in covering_prefixes(*near, filters['radius_km']):
+            cells |= Q(geohash__gte=prefix, geohash__lt=prefix_upper_bound(prefix))
+        self.queryset = self.queryset.filter(cells, latitude__isnull=False, longitude__isnull=False)
+
     def _apply_ordering(self, filters: Dict[str, Any]) -> None:
-        order_by = filters.get('order_by', '-start_date')
+        order_by = filters.get('order_by', self.DEFAULT_ORDERING)
+        if order_by == 'relevance':
+            if self.search_query:
+                self.queryset = get_search_backend().order_by_relevance(self.queryset, self.search_query)
+            return
+
+        if order_by.lstrip('-') not in self.ORDERING_FIELDS:
+            order_by = self.DEFAULT_ORDERING
         self.queryset = self.queryset.order_by(order_by)
 
+    def apply_read_annotations(
+        self,
+        user=None,
+        fields: Optional[Iterable[str]] = None,
+        expand: Optional[Iterable[str]] = None
+    ) -> 'EventQueryBuilder':
+        """
+        Loads the nested relations and annotates the favorite flag EventSerializer reads, so rows need no
+        extra queries. With a sparse fieldset, only the requested columns, joins and annotations are loaded.
+        """
+        if fields is None and expand is None:
+            self._load_relations(self.RELATION_FIELDS)
+            self.queryset = self.queryset.annotate(is_favorited=self._favorited_expression(user))
+            return self
+
+        expand = set(expand or ())
+        related = [
+            name for name in self.RELATION_FIELDS
+            if name in expand and (fields is None or name in fields)
+        ]
+        self._load_relations(related)
+
+        if fields is None or 'is_favorited' in fields:
+            self.queryset = self.queryset.annotate(is_favorited=self._favorited_expression(user))
+
+        if fields is not None:
+            self.queryset = self.queryset.only(*self._columns_for(fields))
+        return self
+
+    def _load_relations(self, related: Iterable[str]) -> None:
+        """
+        Joins the category; organizers come from a single prefetch query per page instead,
+        which carries the follower counts their UserSerializer would otherwise count per row.
+        """
+        if 'category' in related:
+            self.queryset = self.queryset.select_related('category')
+        if 'organizer' in related:
+            self.queryset = self.queryset.prefetch_related(User.objects.prefetch_with_follow_counts('organizer'))
+
+    def _columns_for(self, fields: Iterable[str]) -> List[str]:
+        """Model columns behind the serializer fields, plus the ordering columns the paginator reads"""
+        concrete = {field.name for field in Event._meta.concrete_fields}
+        columns = {self.SERIALIZER_COLUMNS.get(name, name) for name in fields}
+        ordering = self.queryset.query.order_by or Event._meta.ordering
+        columns.update(name.lstrip('-') for name in ordering if isinstance(name, str))
+        return sorted(column for column in columns if column in concrete)
+
+    @staticmethod
+    def _favorited_expression(user):
+        if user and user.is_authenticated:
+            return Exists(
+                Event.favorites.through.objects.filter(event_id=OuterRef('pk'), user_id=user.id)
+            )
+        return Value(False, output_field=BooleanField())
+
     def build(self) -> QuerySet:
         return self.queryset
\ No newline at end of file
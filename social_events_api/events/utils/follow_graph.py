@@ -0,0 +1,102 @@
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+Adjacency = Dict[int, array]
+
+_EMPTY = array('q')
+
+
+class FollowGraph:
+    """
+    Directed follow graph kept as one sorted array of 64-bit user ids per user and direction,
+    about 8 bytes per edge and side. Readers never lock: an update builds a new array and swaps
+    it in, and a rebuild swaps both directions in one assignment.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._edges: Tuple[Adjacency, Adjacency] = ({}, {})
+
+    def load(self, edges: Iterable[Tuple[int, int]]) -> int:
+        """Replaces the graph with (follower id, following id) pairs, returning how many were read"""
+        following: Dict[int, List[int]] = {}
+        followers: Dict[int, List[int]] = {}
+        count = 0
+        for follower_id, following_id in edges:
+            following.setdefault(follower_id, []).append(following_id)
+            followers.setdefault(following_id, []).append(follower_id)
+            count += 1
+
+        with self._lock:
+            self._edges = (self._pack(following), self._pack(followers))
+        return count
+
+    def add(self, follower_id: int, following_id: int) -> None:
+        with self._lock:
+            following, followers = self._edges
+            self._insert(following, follower_id, following_id)
+            self._insert(followers, following_id, follower_id)
+
+    def remove(self, follower_id: int, following_id: int) -> None:
+        with self._lock:
+            following, followers = self._edges
+            self._discard(following, follower_id, following_id)
+            self._discard(followers, following_id, follower_id)
+
+    def following(self, user_id: int) -> array:
+        return self._edges[0].get(user_id, _EMPTY)
+
+    def followers(self, user_id: int) -> array:
+        return self._edges[1].get(user_id, _EMPTY)
+
+    def follows(self, follower_id: int, following_id: int) -> bool:
+        return contains(self.following(follower_id), following_id)
+
+    def __len__(self) -> int:
+        return sum(len(ids) for ids in self._edges[0].values())
+
+    @staticmethod
+    def _pack(adjacency: Dict[int, List[int]]) -> Adjacency:
+        return {user_id: array('q', sorted(set(ids))) for user_id, ids in adjacency.items()}
+
+    @staticmethod
+    def _insert(adjacency: Adjacency, user_id: int, other_id: int) -> None:
+        ids = adjacency.get(user_id, _EMPTY)
+        index = bisect_left(ids, other_id)
+        if index < len(ids) and ids[index] == other_id:
+            return
+        updated = array('q', ids)
+        updated.insert(index, other_id)
+        adjacency[user_id] = updated
+
+    @staticmethod
+    def _discard(adjacency: Adjacency, user_id: int, other_id: int) -> None:
+        ids = adjacency.get(user_id, _EMPTY)
+        index = bisect_left(ids, other_id)
+        if index == len(ids) or ids[index] != other_id:
+            return
+        if len(ids) == 1:
+            del adjacency[user_id]
+            return
+        updated = array('q', ids)
+        del updated[index]
+        adjacency[user_id] = updated
+
+
+def contains(ids: Sequence[int], user_id: int) -> bool:
+    """Membership test on a sorted id array"""
+    index = bisect_left(ids, user_id)
+    return index < len(ids) and ids[index] == user_id
+
+
+def intersect(left: Sequence[int], right: Sequence[int]) -> List[int]:
+    """Sorted ids present in both sorted arrays"""
+    if len(left) > len(right):
+        left, right = right, left
+    if not left:
+        return []
+    if len(right) > 32 * len(left):
+        # Binary search the larger side for each id of the much smaller one
+        return [user_id for user_id in left if contains(right, user_id)]
+    return sorted(set(left).intersection(right))
@@ -0,0 +1,76 @@
+import math
+from typing import List, Tuple
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+MAX_PRECISION = 9
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 110.574
+KM_PER_DEGREE_LON = 111.320
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int = MAX_PRECISION) -> str:
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    geohash, bits, bit_count, use_longitude = [], 0, 0, True
+
+    while len(geohash) < precision:
+        value, interval = (longitude, lon_range) if use_longitude else (latitude, lat_range)
+        middle = (interval[0] + interval[1]) / 2
+        if value >= middle:
+            bits = (bits << 1) | 1
+            interval[0] = middle
+        else:
+            bits <<= 1
+            interval[1] = middle
+
+        use_longitude = not use_longitude
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(BASE32[bits])
+            bits, bit_count = 0, 0
+    return ''.join(geohash)
+
+
+def cell_size_degrees(precision: int) -> Tuple[float, float]:
+    """Height and width in degrees of a geohash cell; longitude takes the extra bit on odd bit counts"""
+    total_bits = 5 * precision
+    lat_bits, lon_bits = total_bits // 2, total_bits - total_bits // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lon_bits)
+
+
+def covering_prefixes(latitude: float, longitude: float, radius_km: float) -> List[str]:
+    """
+    Geohash prefixes of the cell holding the point and its eight neighbours, at the finest
+    precision whose cells are still at least radius_km wide, so the circle is fully covered.
+    Returns an empty list when the radius is too large for any prefix to prune.
+    """
+    precision = 0
+    for candidate in range(1, MAX_PRECISION + 1):
+        height, width = cell_size_degrees(candidate)
+        height_km = height * KM_PER_DEGREE_LAT
+        width_km = width * KM_PER_DEGREE_LON * math.cos(math.radians(latitude))
+        if min(height_km, width_km) < radius_km:
+            break
+        precision = candidate
+
+    if precision == 0:
+        return []
+
+    height, width = cell_size_degrees(precision)
+    prefixes = set()
+    for lat_step in (-1, 0, 1):
+        for lon_step in (-1, 0, 1):
+            lat = min(max(latitude + lat_step * height, -90.0), 90.0)
+            lon = (longitude + lon_step * width + 180.0) % 360.0 - 180.0
+            prefixes.add(encode_geohash(lat, lon, precision))
+    return sorted(prefixes)
+
+
+def prefix_upper_bound(prefix: str) -> str:
+    """Smallest string greater than every geohash starting with prefix, for index range scans"""
+    return prefix + '~'
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
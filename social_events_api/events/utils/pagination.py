@@ -0,0 +1,223 @@
+import base64
+import bisect
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, List, Optional, Tuple
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Field, Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination that seeks past the last row of the previous page instead of using OFFSET,
+    so every page costs the same. The cursor stores the values of the ordering fields plus the
+    primary key, which is appended as a tie-breaker. Ordering fields must be non-nullable.
+    """
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    default_ordering = ('-pk',)
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None) -> List[Any]:
+        self.base_url = request.build_absolute_uri()
+        self.query_params = request.query_params
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+
+        position, reverse = self.decode_cursor(request)
+        if position is not None:
+            position = self._parse_position(queryset, position)
+        ordering = [(field, not desc) if reverse else (field, desc) for field, desc in self.ordering]
+
+        queryset = queryset.order_by(*[f"-{field}" if desc else field for field, desc in ordering])
+        if position is not None:
+            queryset = queryset.filter(self._seek_filter(ordering, position))
+
+        return self._finish_page(list(queryset[:self.page_size + 1]), position, reverse)
+
+    def paginate_sorted_keys(self, keys: List[tuple], request) -> List[tuple]:
+        """
+        Same pagination over an in-memory list of ascending sort-key tuples,
+        for results ranked outside the database (e.g. by distance).
+        """
+        self.base_url = request.build_absolute_uri()
+        self.query_params = request.query_params
+        self.page_size = self.get_page_size(request)
+        self.ordering = [(f"key{index}", False) for index in range(len(keys[0]) if keys else 0)]
+
+        position, reverse = self.decode_cursor(request)
+        try:
+            if position is None:
+                candidates = keys[:self.page_size + 1]
+            elif reverse:
+                end = bisect.bisect_left(keys, tuple(position))
+                candidates = keys[max(end - self.page_size - 1, 0):end][::-1]
+            else:
+                start = bisect.bisect_right(keys, tuple(position))
+                candidates = keys[start:start + self.page_size + 1]
+        except TypeError:
+            # The cursor values do not compare with the keys, e.g. a cursor of another listing
+            raise NotFound(self.invalid_cursor_message)
+        return self._finish_page(candidates, position, reverse)
+
+    def _finish_page(self, results: List[Any], position: Optional[List[Any]], reverse: bool) -> List[Any]:
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        self.has_next = True if reverse else has_more
+        self.has_previous = has_more if reverse else position is not None
+        self.page = results
+        return results
+
+    def get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, queryset: QuerySet) -> List[Tuple[str, bool]]:
+        """Reads the ordering already applied to the queryset and appends the primary key"""
+        ordering = queryset.query.order_by or queryset.model._meta.ordering or self.default_ordering
+        self.pk_name = queryset.model._meta.pk.name
+
+        parsed = []
+        for field in ordering:
+            if not isinstance(field, str):
+                raise TypeError("KeysetPagination only supports field name orderings")
+            desc = field.startswith('-')
+            name = field.lstrip('-')
+            if name in ('pk', queryset.model._meta.pk.name):
+                parsed.append(('pk', desc))
+                return parsed
+            parsed.append((name, desc))
+
+        parsed.append(('pk', parsed[0][1] if parsed else True))
+        return parsed
+
+    def get_paginated_response(self, data) -> Response:
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next or not self.page:
+            return None
+        return self._build_link(self._position_of(self.page[-1]), reverse=False)
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous or not self.page:
+            return None
+        return self._build_link(self._position_of(self.page[0]), reverse=True)
+
+    def encode_cursor(self, position: List[Any], reverse: bool) -> str:
+        payload = json.dumps({'p': [self._encode_value(value) for value in position], 'r': int(reverse)})
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, request) -> Tuple[Optional[List[Any]], bool]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            position, reverse = payload['p'], bool(payload['r'])
+        except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def _parse_position(self, queryset: QuerySet, position: List[Any]) -> List[Any]:
+        """
+        Converts the cursor values to the Python types of the ordering fields. A tampered cursor,
+        or one taken under another ordering, does not fit them and is rejected like a malformed one.
+        """
+        parsed = []
+        for (name, _), value in zip(self.ordering, position):
+            field = self._resolve_field(queryset, name)
+            try:
+                if value is None:
+                    raise ValidationError("Ordering fields are non-nullable")
+                parsed.append(field.to_python(value) if field is not None else value)
+            except (ValidationError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+        return parsed
+
+    @staticmethod
+    def _resolve_field(queryset: QuerySet, name: str) -> Optional[Field]:
+        """Model field or annotation output field an ordering name refers to, following relations"""
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field
+        model = queryset.model
+        field = None
+        for part in name.split('__'):
+            if model is None:
+                return None
+            try:
+                field = model._meta.pk if part == 'pk' else model._meta.get_field(part)
+            except FieldDoesNotExist:
+                return None
+            model = field.related_model
+        return field
+
+    def _seek_filter(self, ordering: List[Tuple[str, bool]], position: List[Any]) -> Q:
+        """
+        Lexicographic "comes after" filter over the ordering fields. The extra bound on
+        the leading field lets the database turn the OR chain into an index range scan.
+        """
+        first_field, first_desc = ordering[0]
+        seek = Q()
+        for index, (field, desc) in enumerate(ordering):
+            equal_prefix = {name: position[i] for i, (name, _) in enumerate(ordering[:index])}
+            lookup = f"{field}__lt" if desc else f"{field}__gt"
+            seek |= Q(**equal_prefix, **{lookup: position[index]})
+
+        leading_bound = Q(**{f"{first_field}__lte" if first_desc else f"{first_field}__gte": position[0]})
+        return leading_bound & seek
+
+    def _position_of(self, obj) -> List[Any]:
+        if isinstance(obj, tuple):
+            return list(obj)
+        if isinstance(obj, dict):
+            # Rows coming from a .values() queryset
+            return [obj[self.pk_name if field == 'pk' else field] for field, _ in self.ordering]
+        return [getattr(obj, field) for field, _ in self.ordering]
+
+    def _build_link(self, position: List[Any], reverse: bool) -> str:
+        params = self.query_params.copy()
+        params[self.cursor_query_param] = self.encode_cursor(position, reverse)
+        return f"{self.base_url.split('?')[0]}?{params.urlencode()}"
+
+    @staticmethod
+    def _encode_value(value: Any) -> Any:
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
@@ -0,0 +1,40 @@
+from typing import Type
+from django.db import connections, router
+from django.db.models import Count, IntegerField, Model, OuterRef, QuerySet, Subquery, Value
+from django.db.models.constants import OnConflict
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(queryset: QuerySet, field: str, outer_ref: str = 'pk') -> Coalesce:
+    """Correlated COUNT of the rows of queryset whose `field` points at the outer row, 0 when there are none"""
+    counts = (
+        queryset
+        .filter(**{field: OuterRef(outer_ref)})
+        .order_by()
+        .values(field)
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def insert_ignoring_conflicts(model: Type[Model], **values) -> bool:
+    """
+    Inserts one row, silently skipping it when it collides with a unique constraint.
+    Unlike bulk_create(ignore_conflicts=True) this reports whether the row was written.
+    """
+    connection = connections[router.db_for_write(model)]
+    quote = connection.ops.quote_name
+    columns = [model._meta.get_field(name).column for name in values]
+    fields = [model._meta.get_field(name) for name in values]
+
+    sql = "{insert} {table} ({columns}) VALUES ({placeholders}) {suffix}".format(
+        insert=connection.ops.insert_statement(on_conflict=OnConflict.IGNORE),
+        table=quote(model._meta.db_table),
+        columns=', '.join(quote(column) for column in columns),
+        placeholders=', '.join(['%s'] * len(columns)),
+        suffix=connection.ops.on_conflict_suffix_sql(fields, OnConflict.IGNORE, None, None),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, list(values.values()))
+        return cursor.rowcount == 1
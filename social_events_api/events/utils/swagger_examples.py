@@ -35,6 +35,12 @@ _COMMENT_EXAMPLE = {
 
 _COMMENT_LIST_EXAMPLE = [_COMMENT_EXAMPLE]
 
+_COMMENT_PAGE_EXAMPLE = {
+    'next': 'http://localhost:8000/comments/eventId/1/?cursor=eyJwIjpb...',
+    'previous': None,
+    'results': _COMMENT_LIST_EXAMPLE
+}
+
 COMMENT_ERROR_EXAMPLES = {
     'VALIDATION_ERROR': {'detail': 'Invalid input data'},
     'FORBIDDEN_ERROR': {'detail': 'Not authorized for this action'},
@@ -67,6 +73,76 @@ _REGISTRATION_EXAMPLE = {
     'status': 'pending',
     'registration_date': '2025-01-24T14:22:00Z'
 }
+
+_USER_REGISTRATION_PAGE_EXAMPLE = {
+    'next': 'http://localhost:8000/registrations/my-registrations/?cursor=eyJwIjpb...',
+    'previous': None,
+    'results': [{
+        'id': 1,
+        'event': {
+            'id': 1,
+            'title': 'Tech Conference',
+            'slug': 'tech-conference',
+            'start_date': '2025-03-15T09:00:00Z',
+            'end_date': '2025-03-15T18:00:00Z',
+            'location': 'Convention Center',
+            'venue': 'Hall A',
+            'status': 'published',
+            'category': {'id': 1, 'name': 'Technology', 'description': 'Tech events', 'created_at': '2025-01-01T00:00:00Z'}
+        },
+        'attendee': 2,
+        'status': 'pending',
+        'registration_date': '2025-01-24T14:22:00Z',
+        'cancelled_date': None,
+        'notes': ''
+    }]
+}
+
+_FEED_PAGE_EXAMPLE = {
+    'next': 'http://localhost:8000/users/me/feed/?cursor=eyJwIjpb...',
+    'previous': None,
+    'results': [{
+        'id': 42,
+        'verb': 'registered',
+        'actor': 3,
+        'actor_username': 'janedoe',
+        'event': {
+            'id': 1,
+            'title': 'Tech Conference',
+            'slug': 'tech-conference',
+            'start_date': '2025-03-15T09:00:00Z',
+            'end_date': '2025-03-15T18:00:00Z',
+            'location': 'Convention Center',
+            'venue': 'Hall A',
+            'status': 'published',
+            'category': {'id': 1, 'name': 'Technology', 'description': 'Tech events', 'created_at': '2025-01-01T00:00:00Z'}
+        },
+        'created_at': '2025-01-24T14:22:00Z'
+    }]
+}
+
+_BULK_REGISTRATION_EXAMPLE = {
+    'created': 1,
+    'results': [
+        {'attendee': 2, 'success': True, 'registration': 10},
+        {'attendee': 3, 'success': False, 'detail': 'Already registred at the event'}
+    ]
+}
+
+_CHECKIN_TOKEN_EXAMPLE = '1k.2s.9.t0x3ny.Qm9sZC1zaWduYXR1'
+
+_CHECKIN_EXAMPLE = {
+    'registration': 56,
+    'event': 100,
+    'attendee': 9,
+    'status': 'queued'
+}
+
+_WAITLIST_EXAMPLE = {
+    'event': 1,
+    'waitlist_position': 3
+}
+
 REGISTRATION_ERROR_EXAMPLES = {
     'VALIDATION_ERROR': {'detail': 'Invalid registration data'},
     'NOT_FOUND_ERROR': {'detail': 'Registration not found'},
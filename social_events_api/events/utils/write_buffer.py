@@ -0,0 +1,242 @@
+import atexit
+import logging
+import threading
+from functools import reduce
+from operator import or_
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple, Type
+from django.db import connection, transaction
+from django.db.models import Model, Q
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[int, int]
+
+
+class _FlushScheduler:
+    """Runs flush() on a daemon timer flush_interval seconds after the first pending write"""
+    flush_interval: float
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        atexit.register(self.flush)
+
+    def flush(self) -> int:
+        raise NotImplementedError
+
+    def _has_pending(self) -> bool:
+        raise NotImplementedError
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _schedule(self) -> None:
+        if self._timer is None and self._has_pending():
+            self._timer = threading.Timer(self.flush_interval, self._flush_in_background)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_in_background(self) -> None:
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Background flush of %s failed", type(self).__name__)
+            with self._lock:
+                self._schedule()
+        finally:
+            connection.close()
+
+
+class ToggleBuffer(_FlushScheduler):
+    """
+    Write-behind buffer for on/off membership rows such as likes and favorites, keyed by
+    (object id, user id). Each entry keeps the stored state and the wanted one, so repeated
+    toggles collapse and a toggle that returns to the stored state drops out entirely.
+    Pending entries are flushed in one transaction with a bulk delete and a bulk insert,
+    when max_pending is reached or flush_interval seconds after the first buffered toggle.
+    Entries being flushed stay visible, so reads never fall between the buffer and the table.
+    """
+    def __init__(
+        self,
+        through: Type[Model],
+        object_field: str,
+        user_field: str,
+        after_flush: Optional[Callable[[Set[int]], None]] = None,
+        max_pending: int = 500,
+        flush_interval: float = 1.0
+    ):
+        self.through = through
+        self.object_field = object_field
+        self.user_field = user_field
+        self.after_flush = after_flush
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self._pending: Dict[Key, Tuple[bool, bool]] = {}
+        self._flushing: Dict[Key, Tuple[bool, bool]] = {}
+        super().__init__()
+
+    def toggle(self, object_id: int, user_id: int) -> bool:
+        """Flips the membership and returns the new state"""
+        key = (object_id, user_id)
+        with self._lock:
+            known = self._known_state(key)
+        stored = known if known is not None else self._load_state(key)
+
+        with self._lock:
+            current = self._known_state(key)
+            if current is None:
+                current = stored
+            stored = self._pending[key][0] if key in self._pending else current
+
+            wanted = not current
+            if wanted == stored:
+                self._pending.pop(key, None)
+            else:
+                self._pending[key] = (stored, wanted)
+            flush_now = len(self._pending) >= self.max_pending
+            if not flush_now:
+                self._schedule()
+
+        if flush_now:
+            self.flush()
+        return wanted
+
+    def pending_state(self, object_id: int, user_id: int) -> Optional[bool]:
+        """State not yet written to the table, None when the table is up to date"""
+        with self._lock:
+            return self._known_state((object_id, user_id))
+
+    def pending_states(self, object_ids: Iterable[int], user_id: int) -> Dict[int, bool]:
+        """pending_state of several objects for one user, only those with a buffered state"""
+        with self._lock:
+            states = {object_id: self._known_state((object_id, user_id)) for object_id in object_ids}
+        return {object_id: state for object_id, state in states.items() if state is not None}
+
+    def pending_delta(self, object_id: int) -> int:
+        """How far the number of stored rows of an object is from its buffered state"""
+        return self.pending_deltas([object_id]).get(object_id, 0)
+
+    def pending_deltas(self, object_ids: Iterable[int]) -> Dict[int, int]:
+        """pending_delta of several objects in one pass over the buffer, only those with buffered toggles"""
+        wanted_ids = set(object_ids)
+        deltas: Dict[int, int] = {}
+        with self._lock:
+            entries = {**self._flushing, **self._pending}
+        for (object_id, _), (stored, wanted) in entries.items():
+            if object_id in wanted_ids:
+                deltas[object_id] = deltas.get(object_id, 0) + int(wanted) - int(stored)
+        return deltas
+
+    def flush(self) -> int:
+        """Writes every pending entry, returning how many rows were changed"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._flushing = batch
+                self._cancel_timer()
+            if not batch:
+                return 0
+
+            try:
+                self._write(batch)
+            except Exception:
+                with self._lock:
+                    self._requeue(batch)
+                raise
+            finally:
+                with self._lock:
+                    self._flushing = {}
+            return len(batch)
+
+    def _write(self, batch: Dict[Key, Tuple[bool, bool]]) -> None:
+        added = [key for key, (_, wanted) in batch.items() if wanted]
+        removed = [key for key, (_, wanted) in batch.items() if not wanted]
+
+        with transaction.atomic():
+            if removed:
+                self.through.objects.filter(self._match(removed)).delete()
+            if added:
+                self.through.objects.bulk_create(
+                    [self.through(**self._lookup(key)) for key in added],
+                    ignore_conflicts=True
+                )
+            if self.after_flush is not None:
+                self.after_flush({object_id for object_id, _ in batch})
+
+    def _requeue(self, batch: Dict[Key, Tuple[bool, bool]]) -> None:
+        """Puts a failed batch back, keeping toggles that arrived while it was being written"""
+        for key, (stored, wanted) in batch.items():
+            if key in self._pending:
+                wanted = self._pending[key][1]
+            if wanted == stored:
+                self._pending.pop(key, None)
+            else:
+                self._pending[key] = (stored, wanted)
+
+    def _known_state(self, key: Key) -> Optional[bool]:
+        entry = self._pending.get(key) or self._flushing.get(key)
+        return entry[1] if entry else None
+
+    def _load_state(self, key: Key) -> bool:
+        return self.through.objects.filter(**self._lookup(key)).exists()
+
+    def _lookup(self, key: Key) -> Dict[str, int]:
+        object_id, user_id = key
+        return {self.object_field: object_id, self.user_field: user_id}
+
+    def _match(self, keys: Iterable[Key]) -> Q:
+        return reduce(or_, (Q(**self._lookup(key)) for key in keys))
+
+    def _has_pending(self) -> bool:
+        return bool(self._pending)
+
+
+class BatchBuffer(_FlushScheduler):
+    """
+    Collects keyed items and hands them to `write` in batches, when max_pending is reached or
+    flush_interval seconds after the first pending item. A key already waiting is not added again.
+    A batch that fails to write is put back for the next flush, so `write` should be idempotent.
+    """
+    def __init__(self, write: Callable[[List[Any]], None], max_pending: int = 200, flush_interval: float = 2.0):
+        self.write = write
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self._pending: Dict[Hashable, Any] = {}
+        super().__init__()
+
+    def add(self, key: Hashable, item: Any) -> bool:
+        """Queues the item, returning False when its key is already waiting"""
+        with self._lock:
+            if key in self._pending:
+                return False
+            self._pending[key] = item
+            flush_now = len(self._pending) >= self.max_pending
+            if not flush_now:
+                self._schedule()
+
+        if flush_now:
+            self.flush()
+        return True
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._cancel_timer()
+            if not batch:
+                return 0
+
+            try:
+                self.write(list(batch.values()))
+            except Exception:
+                with self._lock:
+                    for key, item in batch.items():
+                        self._pending.setdefault(key, item)
+                raise
+            return len(batch)
+
+    def _has_pending(self) -> bool:
+        return bool(self._pending)
@@ -6,15 +6,32 @@ from rest_framework.response import Response
 from ..serializers import CommentCreateSerializer, CommentSerializer
 from ..service.comment_service import CommentService
 from ..service.event_query_service import EventQueryService
+from ..service.event_cache_service import EventCommentsCacheService
 from ..models import Comment
-from ..utils.swagger_examples import _COMMENT_EXAMPLE, _COMMENT_LIST_EXAMPLE, COMMENT_ERROR_EXAMPLES as _ERROR_EXAMPLES
+from ..utils.conditional import not_modified_response, set_validators
+from ..utils.pagination import KeysetPagination
+from ..utils.swagger_examples import _COMMENT_EXAMPLE, _COMMENT_PAGE_EXAMPLE, COMMENT_ERROR_EXAMPLES as _ERROR_EXAMPLES
+
+
+class CommentCursorPagination(KeysetPagination):
+    """
+    Keyset pagination for comments, newest first, seeking on (created_at, id).
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
 
 class CommentViewSet(viewsets.ModelViewSet):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = CommentCursorPagination
     comment_service = CommentService()
     event_service = EventQueryService()
+    comments_cache = EventCommentsCacheService()
+    reply_window = 3
+    max_reply_window = 20
 
     def get_serializer_class(self):
         """Return appropriate serializer based on action."""
@@ -83,7 +100,14 @@ class CommentViewSet(viewsets.ModelViewSet):
         """Update an existing comment with authorization check."""
         instance = self.get_object()
         self.comment_service.validate_authority(instance, request.user)
-        return super().update(request, *args, **kwargs)
+        serializer = self.get_serializer(instance, data=request.data, partial=kwargs.pop('partial', False))
+        serializer.is_valid(raise_exception=True)
+
+        comment = self.comment_service.update(instance, serializer.validated_data, request.user)
+        return Response(
+            self.get_serializer(comment).data,
+            status=status.HTTP_200_OK
+        )
 
     @swagger_auto_schema(
         operation_description="Delete comment (author only)",
@@ -99,15 +123,15 @@ class CommentViewSet(viewsets.ModelViewSet):
     def destroy(self, request, *args, **kwargs):
         """Delete a comment with authorization check."""
         instance = self.get_object()
-        self.comment_service.validate_authority(instance, request.user)
-        return super().destroy(request, *args, **kwargs)
+        self.comment_service.delete(instance, request.user)
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
     @swagger_auto_schema(
-        operation_description="Like a comment (authenticated users only)",
+        operation_description="Toggle the like of a comment (authenticated users only)",
         responses={
             200: openapi.Response(
-                description="Like registered successfully",
-                examples={'application/json': {'detail': 'Like successfully registered'}}
+                description="Like toggled successfully",
+                examples={'application/json': {'status': 'like', 'likes_count': 3}}
             ),
             400: openapi.Response(
                 description="Like processing error",
@@ -121,26 +145,41 @@ class CommentViewSet(viewsets.ModelViewSet):
         """Handle comment liking functionality."""
         comment = self.get_object()
         user = request.user
-        message = self.comment_service.like(comment, user)
-        return Response(
-            data={'detail': message},
-            status=status.HTTP_200_OK if 'success' in message.lower() else status.HTTP_400_BAD_REQUEST
-        )
+        result = self.comment_service.like(comment, user)
+        return Response(data=result, status=status.HTTP_200_OK)
 
     @swagger_auto_schema(
-        operation_description="Get comments by event ID",
+        operation_description="Get top-level comments by event ID, newest first, each with its latest replies",
         manual_parameters=[
             openapi.Parameter(
                 'eventId', openapi.IN_PATH,
                 description="ID of the event",
                 type=openapi.TYPE_INTEGER
+            ),
+            openapi.Parameter(
+                'cursor', openapi.IN_QUERY,
+                description="Opaque cursor taken from the next/previous links",
+                type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'page_size', openapi.IN_QUERY,
+                description="Number of top-level comments per page (max 100)",
+                type=openapi.TYPE_INTEGER
+            ),
+            openapi.Parameter(
+                'replies_page_size', openapi.IN_QUERY,
+                description="Number of replies embedded per comment (default 3, max 20). "
+                            "has_more_replies tells whether more exist; the replies endpoint continues "
+                            "from replies_cursor, or from its first page when the cursor is null",
+                type=openapi.TYPE_INTEGER
             )
         ],
         responses={
             200: openapi.Response(
                 description="Comments retrieved successfully",
-                examples={'application/json': _COMMENT_LIST_EXAMPLE}
+                examples={'application/json': _COMMENT_PAGE_EXAMPLE}
             ),
+            304: openapi.Response(description="Not modified since the ETag sent in If-None-Match"),
             404: openapi.Response(
                 description="Event not found",
                 examples={'application/json': _ERROR_EXAMPLES['NOT_FOUND_ERROR']}
@@ -150,7 +189,12 @@ class CommentViewSet(viewsets.ModelViewSet):
     )
     @action(detail=False, methods=['get'], url_path='eventId/(?P<eventId>\d+)')
     def get_by_event_id(self, request, eventId):
-        """Retrieve comments associated with a specific event."""
+        """Retrieve comments associated with a specific event, or 304 when If-None-Match still matches."""
+        etag = self.comments_cache.etag(int(eventId), request)
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
         event = self.event_service.get_event_by_id_or_slug(eventId)
         if not event:
             return Response(
@@ -158,18 +202,32 @@ class CommentViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        comments = self.comment_service.get_by_event(event)
-        return Response(
-            CommentSerializer(comments, many=True).data,
-            status=status.HTTP_200_OK
-        )
+        comments = self.paginate_queryset(self.comment_service.get_by_event(event))
+        self.comment_service.attach_reply_windows(comments, self._get_reply_window(request))
+        self.comment_service.apply_pending_likes(comments)
+        for comment in comments:
+            comment.replies_cursor = self._get_replies_cursor(comment)
+
+        return set_validators(self.get_paginated_response(CommentSerializer(comments, many=True).data), etag)
 
     @swagger_auto_schema(
-        operation_description="Get comment replies",
+        operation_description="Get comment replies, newest first",
+        manual_parameters=[
+            openapi.Parameter(
+                'cursor', openapi.IN_QUERY,
+                description="Opaque cursor taken from the next/previous links or a comment's replies_cursor",
+                type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'page_size', openapi.IN_QUERY,
+                description="Number of replies per page (max 100)",
+                type=openapi.TYPE_INTEGER
+            )
+        ],
         responses={
             200: openapi.Response(
                 description="Replies retrieved successfully",
-                examples={'application/json': _COMMENT_LIST_EXAMPLE}
+                examples={'application/json': _COMMENT_PAGE_EXAMPLE}
             )
         },
         tags=['Comment']
@@ -178,8 +236,25 @@ class CommentViewSet(viewsets.ModelViewSet):
     def replies(self, request, pk):
         """Retrieve replies to a specific comment."""
         comment = self.get_object()
-        replies = self.comment_service.get_replies(comment)
-        return Response(
-            self.get_serializer(replies, many=True).data,
-            status=status.HTTP_200_OK
-        )
\ No newline at end of file
+        replies = self.comment_service.apply_pending_likes(
+            self.paginate_queryset(self.comment_service.get_replies(comment))
+        )
+        return self.get_paginated_response(self.get_serializer(replies, many=True).data)
+
+    def _get_reply_window(self, request) -> int:
+        try:
+            size = int(request.query_params['replies_page_size'])
+        except (KeyError, ValueError):
+            return self.reply_window
+        return min(max(size, 0), self.max_reply_window)
+
+    def _get_replies_cursor(self, comment: Comment):
+        """
+        Cursor for the replies endpoint starting right after the last embedded reply. None when all
+        replies are embedded, or when none are and the replies endpoint is read from its first page.
+        """
+        embedded = comment.thread_replies
+        if comment.replies_count <= len(embedded) or not embedded:
+            return None
+        last = embedded[-1]
+        return self.paginator.encode_cursor([last.created_at, last.id], reverse=False)
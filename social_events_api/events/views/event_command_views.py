@@ -1,3 +1,4 @@
+from django.http import StreamingHttpResponse
 from rest_framework import viewsets, status, permissions
 from rest_framework.response import Response
 from rest_framework.decorators import action
@@ -5,8 +6,10 @@ from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from ..models import Event
 from ..serializers import EventSerializer, EventCreateSerializer, RegistrationSerializer
-from ..service.event_command_service import EventCommandService  
+from ..service.event_command_service import EventCommandService, REGISTRATION_EXPORT_COLUMNS
+from ..service.event_query_service import EventQueryService
 from ..service.event_validation_service import EventValidationService  
+from ..utils.export import csv_lines, ndjson_lines
 from ..utils.swagger_examples import _SUCCESS_MESSAGE, _EVENT_EXAMPLE, EVENT_ERROR_EXAMPLES as _ERROR_EXAMPLES
 
 class EventCommandViewSet(viewsets.ModelViewSet):
@@ -19,15 +22,21 @@ class EventCommandViewSet(viewsets.ModelViewSet):
     - destroy: Delete event (Authenticated)
     - favorite: Toggle favorite status (Authenticated)
     - registrations: Get event registrations (Public)
+    - export_registrations: Stream the attendee list as CSV or NDJSON (Organizer)
     """
     queryset = Event.objects.all()
     event_command_service = EventCommandService()
     event_validation_service = EventValidationService()
+    event_query_service = EventQueryService()
 
+    def get_queryset(self):
+        if self.action in ['list', 'retrieve']:
+            return self.event_query_service.get_events(self.request.user)
+        return super().get_queryset()
 
     def get_permissions(self):
         """Dynamically assign permissions based on action"""
-        if self.action in ['create', 'update', 'partial_update', 'destroy', 'favorite']:
+        if self.action in ['create', 'update', 'partial_update', 'destroy', 'favorite', 'export_registrations']:
             return [permissions.IsAuthenticated()]
         return [permissions.AllowAny()]
 
@@ -231,4 +240,59 @@ class EventCommandViewSet(viewsets.ModelViewSet):
         return Response(
             RegistrationSerializer(registrations, many=True).data,
             status=status.HTTP_200_OK
-        )
\ No newline at end of file
+        )
+
+    @swagger_auto_schema(
+        method="get",
+        operation_summary="Export event attendees",
+        operation_description="Stream every registration of the event with its attendee, as CSV or NDJSON "
+                              "(event organizer only). Memory use does not grow with the number of attendees.",
+        manual_parameters=[
+            openapi.Parameter(
+                'id', openapi.IN_PATH,
+                description="Event ID",
+                type=openapi.TYPE_INTEGER
+            ),
+            openapi.Parameter(
+                'output', openapi.IN_QUERY,
+                description="csv (default) or ndjson",
+                type=openapi.TYPE_STRING
+            )
+        ],
+        responses={
+            200: openapi.Response(description="Attendee export stream"),
+            403: openapi.Response(
+                description="Permission error",
+                examples={'application/json': _ERROR_EXAMPLES['PERMISSION_ERROR']}
+            ),
+            404: openapi.Response(
+                description="Not found",
+                examples={'application/json': _ERROR_EXAMPLES['NOT_FOUND_ERROR']}
+            )
+        },
+        tags=['Events']
+    )
+    @action(detail=True, methods=['get'], url_path='registrations/export')
+    def export_registrations(self, request, pk=None):
+        """Stream event registrations as CSV or NDJSON"""
+        event = self.get_object()
+        if not self.event_command_service.can_export_registrations(event, request.user):
+            return Response(
+                {'detail': 'You do not have permission for this action'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        output = request.query_params.get('output', 'csv').lower()
+        if output not in ('csv', 'ndjson'):
+            return Response(
+                {'detail': 'output must be csv or ndjson'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        rows = self.event_command_service.export_registrations(event)
+        if output == 'csv':
+            response = StreamingHttpResponse(csv_lines(rows, REGISTRATION_EXPORT_COLUMNS), content_type='text/csv')
+        else:
+            response = StreamingHttpResponse(ndjson_lines(rows), content_type='application/x-ndjson')
+        response['Content-Disposition'] = f'attachment; filename="{event.slug}-attendees.{output}"'
+        return response
@@ -1,30 +1,79 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from django.utils.dateparse import parse_datetime
-from ..serializers import EventSerializer
+from ..serializers import EventSerializer, EventValuesSerializer, RecommendationSerializer, UserSerializer
 from ..models import Event
 from ..service.event_query_service import EventQueryService
+from ..service.follow_graph_service import FollowGraphService
+from ..service.recommendation_service import RecommendationService
+from ..service.event_cache_service import EventSearchCacheService, EventDetailCacheService
 from ..utils.filter import EventFilterBuilder
+from ..utils.conditional import not_modified_response, set_validators
+from ..utils.pagination import KeysetPagination
 
-class EventQueryViewSet(viewsets.ModelViewSet):
+
+class EventCursorPagination(KeysetPagination):
+    """
+    Keyset pagination for event listings, seeking on the selected ordering field and the event id.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class EventQueryViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Event.objects.all()
     serializer_class = EventSerializer
+    pagination_class = EventCursorPagination
     event_service = EventQueryService()
+    search_cache = EventSearchCacheService()
+    detail_cache = EventDetailCacheService()
+    follow_graph = FollowGraphService()
+    recommendation_service = RecommendationService()
+
+    def get_queryset(self):
+        if self.action == 'list':
+            return self.event_service.get_events(self.request.user)
+        return super().get_queryset()
 
     def get_object(self):
         identifier = self.kwargs.get('pk') 
-        event = self.event_service.get_event_by_id_or_slug(identifier)
+        event = self.event_service.get_event_by_id_or_slug(identifier, self.request.user)
         return event
 
-    
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Serve the cached rendering of the event by id or slug, overlaying
+        the requesting user's favorite flag which is never cached.
+        Answers 304 straight from the per-event version when If-None-Match still matches.
+        """
+        identifier = self.kwargs.get('pk')
+        etag = self.detail_cache.etag(identifier, request.user)
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        data, version = self.detail_cache.get_or_render(
+            identifier,
+            lambda: self.get_serializer(self.event_service.get_event_by_id_or_slug(identifier)).data
+        )
+        response = Response(
+            data={**data, 'is_favorited': self.event_service.is_favorited(data['id'], request.user)},
+            status=status.HTTP_200_OK
+        )
+        if etag is None and version is not None:
+            etag = self.detail_cache.build_etag(data['id'], version, request.user)
+        return set_validators(response, etag)
+
     @action(detail=False, methods=['get'])
     def search(self, request):
         """
         Search events with various filters
         
         Query Parameters:
-        - q: Search query for title, description, location, venue
+        - q: Full-text search over title, description, location, venue
         - category: Category ID
         - date_from: Start date (YYYY-MM-DD HH:MM:SS)
         - date_to: End date (YYYY-MM-DD HH:MM:SS)
@@ -32,22 +81,110 @@ class EventQueryViewSet(viewsets.ModelViewSet):
         - price_max: Maximum price
         - status: Event status (draft/published/cancelled)
         - location: Location search
-        - available_only: Show only available events (true/false)
+        - available_only: Show only upcoming published events with seats left (true/false)
         - favorites_only: Show only favorited events (true/false)
         - organizer: Organizer ID
-        - order_by: Field to order by (e.g., start_date, -created_at)
+        - order_by: Field to order by (start_date, end_date, created_at, price, title,
+          prefixed with - for descending, or relevance when q is set)
+        - cursor: Opaque cursor taken from the next/previous links
+        - page_size: Number of events per page (max 100)
+        - fields: Comma-separated subset of event fields to return (e.g. id,title,slug,start_date)
+        - expand: Comma-separated relations to nest (organizer, category); others are returned as ids
+        - near: Latitude,longitude; returns events within radius_km sorted by distance (adds distance_km)
+        - radius_km: Search radius for near (default 10, max 500)
+
+        Anonymous results are cached until the TTL expires or any event is written.
+        """
+        return self._search(request, use_values=False)
+
+    @action(detail=False, methods=['get'])
+    def listing(self, request):
+        """
+        Same parameters and response as search, rendered straight from `.values()` rows
+        without instantiating models or serializers. Meant for high-volume listing pages.
         """
+        return self._search(request, use_values=True)
+
+    def _search(self, request, use_values: bool):
         filter_builder = EventFilterBuilder(request)
+        filters = filter_builder.get_filters()
+        search_query = request.query_params.get('q')
+        fields = self._get_csv_param(request, 'fields', EventSerializer.Meta.fields)
+        expand = self._get_csv_param(request, 'expand', EventSerializer.EXPANDABLE_FIELDS)
+
+        cache_key = None
+        if not request.user.is_authenticated:
+            cache_key = self.search_cache.build_key(filters, search_query, request, fields, expand)
+            cached = self.search_cache.get(cache_key)
+            if cached is not None:
+                return Response(data=cached, status=status.HTTP_200_OK)
+
         events = self.event_service.search_events(
-            search_query=request.query_params.get('q'),
-            filters=filter_builder.get_filters(),
-            user=request.user
+            search_query=search_query,
+            filters=filters,
+            user=request.user,
+            fields=fields,
+            expand=expand
         )
 
-        page = self.paginate_queryset(events)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+        if use_values:
+            values_serializer = EventValuesSerializer(self.get_serializer_context(), fields, expand)
+            prepare, serialize = values_serializer.prepare, values_serializer.render
+        else:
+            prepare = lambda queryset: queryset
+            serialize = lambda rows: self.get_serializer(rows, many=True, fields=fields, expand=expand).data
+
+        if filters.get('near'):
+            response = self._paginate_by_distance(events, filters, prepare, serialize)
+        else:
+            page = self.paginate_queryset(prepare(events))
+            response = self.get_paginated_response(serialize(page))
+
+        if cache_key:
+            self.search_cache.set(cache_key, response.data)
+        else:
+            self.event_service.apply_pending_favorites(response.data['results'], request.user)
+        return response
+
+    def _paginate_by_distance(self, events, filters, prepare, serialize):
+        """Ranks the geohash candidates by exact distance, then loads only the events of the requested page"""
+        ranked = self.event_service.rank_by_distance(events, *filters['near'], filters['radius_km'])
+        page = self.paginator.paginate_sorted_keys(ranked, self.request)
+
+        rows = prepare(events.filter(id__in=[event_id for _, event_id in page]))
+        rows_by_id = {row['id'] if isinstance(row, dict) else row.id: row for row in rows}
+        ordered_rows = [rows_by_id[event_id] for _, event_id in page]
+
+        data = [
+            {**item, 'distance_km': round(distance, 3)}
+            for item, (distance, _) in zip(serialize(ordered_rows), page)
+        ]
+        return self.get_paginated_response(data)
+
+    @action(detail=False, methods=['get'], url_path='search/cache-stats', permission_classes=[IsAdminUser])
+    def search_cache_stats(self, request):
+        """Hit/miss counters of this process' anonymous search cache (staff only)"""
+        return Response(data=self.search_cache.stats(), status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def recommended(self, request):
+        """Upcoming events recommended to the authenticated user, refreshed by compute_recommendations"""
+        recommendations = self.recommendation_service.get_for_user(request.user)
+        return Response(data=RecommendationSerializer(recommendations, many=True).data, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['get'], url_path='friends-attending', permission_classes=[IsAuthenticated])
+    def friends_attending(self, request, pk=None):
+        """Users the authenticated user follows who are registered for the event"""
+        event = self.get_object()
+        user_ids = self.follow_graph.friends_attending(event.id, request.user)
+        users = UserSerializer(self.follow_graph.get_users(user_ids), many=True).data
+        return Response(data=users, status=status.HTTP_200_OK)
 
-        events = self.get_serializer(events, many=True).data
-        return Response(data=events, status=status.HTTP_200_OK)
+    @staticmethod
+    def _get_csv_param(request, name, allowed):
+        """Parses a comma-separated query parameter, keeping only allowed values; None when absent or none are allowed"""
+        raw = request.query_params.get(name)
+        if not raw:
+            return None
+        values = [value.strip() for value in raw.split(',')]
+        return [value for value in allowed if value in values] or None
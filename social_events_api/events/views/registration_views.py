@@ -4,10 +4,25 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from django.shortcuts import get_object_or_404
-from ..models import Registration
-from ..serializers import RegistrationSerializer, RegistrationCreateSerializer
+from ..models import Registration, User
+from ..serializers import (
+    RegistrationSerializer, RegistrationCreateSerializer, BulkRegistrationSerializer, UserRegistrationSerializer,
+    CheckInSerializer, CheckInSyncSerializer
+)
 from ..service.registration_service import RegistrationService
-from ..utils.swagger_examples import _REGISTRATION_EXAMPLE, REGISTRATION_ERROR_EXAMPLES as _ERROR_EXAMPLES
+from ..service.checkin_service import CheckInService
+from ..service.waitlist_service import WaitlistService
+from ..utils.pagination import KeysetPagination
+from ..utils.swagger_examples import _CHECKIN_EXAMPLE, _CHECKIN_TOKEN_EXAMPLE, _REGISTRATION_EXAMPLE, _BULK_REGISTRATION_EXAMPLE, _USER_REGISTRATION_PAGE_EXAMPLE, _WAITLIST_EXAMPLE, REGISTRATION_ERROR_EXAMPLES as _ERROR_EXAMPLES
+
+
+class RegistrationCursorPagination(KeysetPagination):
+    """
+    Keyset pagination for registrations, newest first, seeking on (registration_date, id).
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
 
 
 class RegistrationViewSet(viewsets.ModelViewSet):
@@ -16,29 +31,53 @@ class RegistrationViewSet(viewsets.ModelViewSet):
     
     Actions:
     - create: Register for an event (Authenticated)
+    - bulk: Register a group of attendees at once (Organizer)
     - cancel: Cancel registration (Authenticated)
     - confirm: Confirm registration (Authenticated)
     - list_user_registrations: Get user's registrations (Authenticated)
+    - waitlist_position: Get user's place in an event's waitlist (Authenticated)
+    - checkin_token: Get the signed check-in token of a confirmed registration (Authenticated)
+    - check_in: Check in an attendee from a scanned token (Organizer)
+    - check_in_sync: Upload check-ins from an offline scanner (Organizer)
     - retrieve: Get registration details (Public)
+    - destroy: Delete a registration (Authenticated)
     """
     queryset = Registration.objects.all()
+    # Status changes go through the cancel and confirm actions, which keep seats and counters right
+    http_method_names = ['get', 'post', 'delete', 'head', 'options']
+    pagination_class = RegistrationCursorPagination
     registration_service = RegistrationService()
+    waitlist_service = WaitlistService()
+    checkin_service = CheckInService()
+
+    def get_queryset(self):
+        """Registrations rendered with their attendee load the attendees and follow counts in one query"""
+        queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.prefetch_related(User.objects.prefetch_with_follow_counts('attendee'))
+        return queryset
 
     def get_serializer_class(self):
         """Select serializer based on action type"""
         if self.action == 'create':
             return RegistrationCreateSerializer
+        if self.action == 'bulk':
+            return BulkRegistrationSerializer
         return RegistrationSerializer
 
     def get_permissions(self):
         """Dynamically assign permissions based on action"""
-        if self.action in ['create', 'cancel', 'confirm', 'list_user_registrations']:
+        if self.action in [
+            'create', 'bulk', 'cancel', 'confirm', 'list_user_registrations', 'waitlist_position',
+            'checkin_token', 'check_in', 'check_in_sync', 'destroy'
+        ]:
             return [permissions.IsAuthenticated()]
         return [permissions.AllowAny()]
 
     @swagger_auto_schema(
         operation_summary="Create registration",
-        operation_description="Register for an event (Authenticated users only)",
+        operation_description="Register for an event (Authenticated users only). "
+                              "When the event is full the user joins its waitlist instead.",
         request_body=RegistrationCreateSerializer,
         responses={
             201: openapi.Response(
@@ -46,6 +85,10 @@ class RegistrationViewSet(viewsets.ModelViewSet):
                 schema=RegistrationSerializer,
                 examples={'application/json': _REGISTRATION_EXAMPLE}
             ),
+            202: openapi.Response(
+                description="Event full, added to the waitlist",
+                examples={'application/json': _WAITLIST_EXAMPLE}
+            ),
             400: openapi.Response(
                 description="Validation error",
                 examples={'application/json': _ERROR_EXAMPLES['VALIDATION_ERROR']}
@@ -69,17 +112,90 @@ class RegistrationViewSet(viewsets.ModelViewSet):
         
         validation = self.registration_service.validate_creation(serializer.validated_data)
         if not validation.success:
+            if validation.error_message == self.registration_service.EVENT_FULL:
+                return self._join_waitlist(serializer.validated_data['event'], request.user)
             return Response(
                 {'detail': validation.error_message}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        registration = self.registration_service.create(serializer.validated_data)
+        result = self.registration_service.create(serializer.validated_data)
+        if not result.success:
+            if result.error_message == self.registration_service.EVENT_FULL:
+                return self._join_waitlist(serializer.validated_data['event'], request.user)
+            return Response(
+                {'detail': result.error_message},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
         return Response(
-            RegistrationSerializer(registration).data,
+            RegistrationSerializer(result.data).data,
             status=status.HTTP_201_CREATED
         )
 
+    def _join_waitlist(self, event, user):
+        result = self.waitlist_service.join(event, user)
+        if not result.success:
+            return Response({'detail': result.error_message}, status=status.HTTP_400_BAD_REQUEST)
+        if isinstance(result.data, Registration):
+            return Response(RegistrationSerializer(result.data).data, status=status.HTTP_201_CREATED)
+
+        return Response(
+            {
+                'detail': "The event is full, you were added to the waitlist",
+                'event': event.id,
+                'waitlist_position': self.waitlist_service.get_position(event.id, user)
+            },
+            status=status.HTTP_202_ACCEPTED
+        )
+
+    @swagger_auto_schema(
+        method="post",
+        operation_summary="Register a group",
+        operation_description="Register up to 500 attendees for an event in one transaction (event organizer only). "
+                              "Seats are reserved for the whole group or not at all; results are returned per attendee.",
+        request_body=BulkRegistrationSerializer,
+        responses={
+            201: openapi.Response(
+                description="Group processed, at least one registration created",
+                examples={'application/json': _BULK_REGISTRATION_EXAMPLE}
+            ),
+            400: openapi.Response(
+                description="Validation error, nothing was created",
+                examples={'application/json': _BULK_REGISTRATION_EXAMPLE}
+            ),
+            403: openapi.Response(
+                description="Permission error",
+                examples={'application/json': _ERROR_EXAMPLES['PERMISSION_ERROR']}
+            )
+        },
+        tags=['Registrations']
+    )
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        """Handle group registration"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        if not self.registration_service.can_register_group(data['event'], request.user):
+            return Response(
+                {'detail': 'Only the organizer can register a group of attendees'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        result = self.registration_service.create_group(
+            data['event'], data['attendees'], data['status'], data.get('notes', '')
+        )
+        if not result.success:
+            return Response({'detail': result.error_message}, status=status.HTTP_400_BAD_REQUEST)
+
+        created = sum(1 for item in result.data if item['success'])
+        return Response(
+            {'created': created, 'results': result.data},
+            status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST
+        )
+
     @swagger_auto_schema(
         method="post",
         operation_summary="Cancel registration",
@@ -111,6 +227,29 @@ class RegistrationViewSet(viewsets.ModelViewSet):
             status=status.HTTP_200_OK
         )
 
+    @swagger_auto_schema(
+        operation_summary="Delete registration",
+        operation_description="Delete a registration, releasing its seat to the waitlist (Authorized users only)",
+        responses={
+            204: openapi.Response(description="Registration deleted"),
+            403: openapi.Response(
+                description="Permission error",
+                examples={'application/json': _ERROR_EXAMPLES['PERMISSION_ERROR']}
+            ),
+            404: openapi.Response(
+                description="Not found",
+                examples={'application/json': _ERROR_EXAMPLES['NOT_FOUND_ERROR']}
+            )
+        },
+        tags=['Registrations']
+    )
+    def destroy(self, request, *args, **kwargs):
+        """Delete a registration with authorization check"""
+        registration = self.get_object()
+        self.registration_service.validate_authority(registration, request.user)
+        self.registration_service.delete(registration)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
     @swagger_auto_schema(
         method="post",
         operation_summary="Confirm registration",
@@ -118,7 +257,10 @@ class RegistrationViewSet(viewsets.ModelViewSet):
         responses={
             200: openapi.Response(
                 description="Registration confirmed",
-                examples={'application/json': {'detail': 'Registration confirmed successfully'}}
+                examples={'application/json': {
+                    'detail': 'Registration confirmed successfully',
+                    'checkin_token': _CHECKIN_TOKEN_EXAMPLE
+                }}
             ),
             403: openapi.Response(
                 description="Permission error",
@@ -136,21 +278,133 @@ class RegistrationViewSet(viewsets.ModelViewSet):
         """Handle registration confirmation"""
         registration = self.get_object()
         self.registration_service.validate_authority(registration, request.user)
-        self.registration_service.confirm(registration)
+        token = self.registration_service.confirm(registration)
         return Response(
-            {"detail": "Registration confirmed successfully"},
+            {"detail": "Registration confirmed successfully", "checkin_token": token},
             status=status.HTTP_200_OK
         )
 
+    @swagger_auto_schema(
+        method="get",
+        operation_summary="Get check-in token",
+        operation_description="Signed QR payload of a confirmed registration (attendee only)",
+        responses={
+            200: openapi.Response(
+                description="Check-in token",
+                examples={'application/json': {'checkin_token': _CHECKIN_TOKEN_EXAMPLE}}
+            ),
+            400: openapi.Response(
+                description="Registration not confirmed",
+                examples={'application/json': _ERROR_EXAMPLES['VALIDATION_ERROR']}
+            )
+        },
+        tags=['Registrations']
+    )
+    @action(detail=True, methods=['get'], url_path='checkin-token')
+    def checkin_token(self, request, pk=None):
+        """Reissue the check-in token of a confirmed registration"""
+        registration = self.get_object()
+        self.registration_service.validate_authority(registration, request.user)
+        if registration.status != 'confirmed':
+            return Response(
+                {'detail': 'Only confirmed registrations have a check-in token'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(
+            {'checkin_token': self.checkin_service.issue_token(registration)},
+            status=status.HTTP_200_OK
+        )
+
+    @swagger_auto_schema(
+        method="post",
+        operation_summary="Check in an attendee",
+        operation_description="Verify a scanned check-in token without a database lookup and record the "
+                              "check-in in the next batch (event organizer only). The status is queued until "
+                              "the batch is written, then already_checked_in for later scans",
+        request_body=CheckInSerializer,
+        responses={
+            200: openapi.Response(
+                description="Token accepted",
+                examples={'application/json': _CHECKIN_EXAMPLE}
+            ),
+            400: openapi.Response(
+                description="Invalid or expired token",
+                examples={'application/json': {'detail': 'Invalid check-in token'}}
+            )
+        },
+        tags=['Registrations']
+    )
+    @action(detail=False, methods=['post'], url_path='check-in')
+    def check_in(self, request):
+        """Handle door check-in"""
+        serializer = CheckInSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        result = self.checkin_service.check_in(serializer.validated_data['token'], request.user)
+        if not result.success:
+            return Response({'detail': result.error_message}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result.data, status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        method="post",
+        operation_summary="Sync offline check-ins",
+        operation_description="Upload up to 1000 scans collected by an offline scanner; "
+                              "results are returned per scan (event organizer only)",
+        request_body=CheckInSyncSerializer,
+        responses={
+            200: openapi.Response(
+                description="Scans processed",
+                examples={'application/json': {'results': [{**_CHECKIN_EXAMPLE, 'status': 'checked_in'}]}}
+            )
+        },
+        tags=['Registrations']
+    )
+    @action(detail=False, methods=['post'], url_path='check-in/sync')
+    def check_in_sync(self, request):
+        """Handle bulk check-in from offline scanners"""
+        serializer = CheckInSyncSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = self.checkin_service.sync(serializer.validated_data['scans'], request.user)
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
     @swagger_auto_schema(
         method="get",
         operation_summary="List user registrations",
-        operation_description="Get all registrations for current user",
+        operation_description="Get the current user's registrations with a summary of each event, newest first",
+        manual_parameters=[
+            openapi.Parameter(
+                'upcoming', openapi.IN_QUERY,
+                description="Only registrations for events that have not started yet (true/false)",
+                type=openapi.TYPE_BOOLEAN
+            ),
+            openapi.Parameter(
+                'past', openapi.IN_QUERY,
+                description="Only registrations for events that already ended (true/false)",
+                type=openapi.TYPE_BOOLEAN
+            ),
+            openapi.Parameter(
+                'status', openapi.IN_QUERY,
+                description="Registration status (pending/confirmed/cancelled)",
+                type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'cursor', openapi.IN_QUERY,
+                description="Opaque cursor taken from the next/previous links",
+                type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'page_size', openapi.IN_QUERY,
+                description="Number of registrations per page (max 100)",
+                type=openapi.TYPE_INTEGER
+            )
+        ],
         responses={
             200: openapi.Response(
                 description="User registrations",
-                schema=RegistrationSerializer(many=True),
-                examples={'application/json': [_REGISTRATION_EXAMPLE]}
+                schema=UserRegistrationSerializer(many=True),
+                examples={'application/json': _USER_REGISTRATION_PAGE_EXAMPLE}
             )
         },
         tags=['Registrations']
@@ -158,9 +412,56 @@ class RegistrationViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], url_path='my-registrations')
     def list_user_registrations(self, request):
         """Retrieve current user's registrations"""
-        registrations = self.registration_service.get_user_registrations(request.user)
+        params = request.query_params
+        statuses = dict(Registration.STATUS_CHOICES)
+        filters = {
+            'upcoming': params.get('upcoming', '').lower() == 'true',
+            'past': params.get('past', '').lower() == 'true',
+            'status': params.get('status') if params.get('status') in statuses else None,
+        }
+
+        registrations = self.paginate_queryset(
+            self.registration_service.get_user_registrations(request.user, filters)
+        )
+        return self.get_paginated_response(UserRegistrationSerializer(registrations, many=True).data)
+
+    @swagger_auto_schema(
+        method="get",
+        operation_summary="Get waitlist position",
+        operation_description="Current user's 1-based place in the waitlist of an event",
+        manual_parameters=[
+            openapi.Parameter(
+                'event', openapi.IN_QUERY,
+                description="Event ID",
+                type=openapi.TYPE_INTEGER,
+                required=True
+            )
+        ],
+        responses={
+            200: openapi.Response(
+                description="Waitlist position",
+                examples={'application/json': _WAITLIST_EXAMPLE}
+            ),
+            404: openapi.Response(
+                description="Not on the waitlist",
+                examples={'application/json': _ERROR_EXAMPLES['NOT_FOUND_ERROR']}
+            )
+        },
+        tags=['Registrations']
+    )
+    @action(detail=False, methods=['get'], url_path='waitlist-position')
+    def waitlist_position(self, request):
+        """Retrieve current user's place in an event's waitlist"""
+        event_id = request.query_params.get('event', '')
+        position = self.waitlist_service.get_position(int(event_id), request.user) if event_id.isdigit() else None
+        if position is None:
+            return Response(
+                {'detail': 'You are not on the waitlist of this event'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
         return Response(
-            RegistrationSerializer(registrations, many=True).data,
+            {'event': int(event_id), 'waitlist_position': position},
             status=status.HTTP_200_OK
         )
 
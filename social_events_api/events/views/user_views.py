@@ -8,14 +8,28 @@ from django.contrib.auth import get_user_model
 from django.db import transaction
 from ..models import UserFollow, UserPreferences
 from ..serializers import (
+    ActivitySerializer,
     UserSerializer, 
     UserPreferencesSerializer,
     UserCreateSerializer,
 )
-from ..utils.swagger_examples import _USER_EXAMPLE, USER_ERROR_EXAMPLES as _ERROR_EXAMPLES
+from ..service.event_cache_service import EventDetailCacheService
+from ..service.feed_service import FeedService
+from ..service.follow_graph_service import FollowGraphService
+from ..utils.pagination import KeysetPagination
+from ..utils.swagger_examples import _FEED_PAGE_EXAMPLE, _USER_EXAMPLE, USER_ERROR_EXAMPLES as _ERROR_EXAMPLES
 
 User = get_user_model()
 
+
+class FeedCursorPagination(KeysetPagination):
+    """
+    Keyset pagination for the activity feed, newest first, seeking on (created_at, id).
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
 class UserViewSet(viewsets.ModelViewSet):
     """
     API endpoint for managing user accounts and social features
@@ -26,10 +40,14 @@ class UserViewSet(viewsets.ModelViewSet):
     - follow: Follow/unfollow user (Authenticated)
     - followers: List user followers (Public)
     - following: List followed users (Public)
+    - mutual: Users you follow who also follow this user (Authenticated)
     - me: Get/update current user profile (Authenticated)
+    - feed: Activity of followed users (Authenticated)
     """
-    queryset = User.objects.all()
+    queryset = User.objects.with_follow_counts()
     serializer_class = UserSerializer
+    follow_graph = FollowGraphService()
+    feed_service = FeedService()
 
     def get_serializer_class(self):
         """Select serializer based on action"""
@@ -111,13 +129,18 @@ class UserViewSet(viewsets.ModelViewSet):
                 follower=request.user,
                 following=user_to_follow
             )
+            # Both users' follow counts are embedded in the details of the events they organize
+            EventDetailCacheService.invalidate_organized_by(request.user.id, user_to_follow.id)
 
             if not created:
                 follow.delete()
+                self.follow_graph.unfollowed(request.user.id, user_to_follow.id)
+                self.feed_service.unfollowed(request.user.id, user_to_follow.id)
                 return Response(
                     {'detail': 'Successfully unfollowed user'},
                     status=status.HTTP_200_OK
                 )
+            self.follow_graph.followed(request.user.id, user_to_follow.id)
 
         return Response(
             {'detail': 'Successfully followed user'},
@@ -140,7 +163,7 @@ class UserViewSet(viewsets.ModelViewSet):
     def followers(self, request, pk=None):
         """Retrieve paginated list of followers"""
         user = self.get_object()
-        followers = user.followers.all()
+        followers = user.followers.with_follow_counts()
         page = self.paginate_queryset(followers)
         
         if page is not None:
@@ -166,7 +189,7 @@ class UserViewSet(viewsets.ModelViewSet):
     def following(self, request, pk=None):
         """Retrieve paginated list of followed users"""
         user = self.get_object()
-        following = user.following.all()
+        following = user.following.with_follow_counts()
         page = self.paginate_queryset(following)
         
         if page is not None:
@@ -176,6 +199,57 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(following, many=True)
         return Response(serializer.data)
 
+    @swagger_auto_schema(
+        operation_summary="Mutual connections",
+        operation_description="Users the authenticated user follows who also follow this user, "
+                              "answered from the in-memory follow graph",
+        responses={
+            200: openapi.Response(
+                description="Mutual connections",
+                schema=UserSerializer(many=True),
+                examples={'application/json': [_USER_EXAMPLE]}
+            )
+        },
+        tags=['Social']
+    )
+    @action(detail=True, methods=['get'])
+    def mutual(self, request, pk=None):
+        """Retrieve followed users who also follow this user"""
+        user = self.get_object()
+        user_ids = self.follow_graph.mutual(request.user, user.id)
+        serializer = self.get_serializer(self.follow_graph.get_users(user_ids), many=True)
+        return Response(serializer.data)
+
+    @swagger_auto_schema(
+        operation_summary="Activity feed",
+        operation_description="Events that followed users organized, favorited or registered for, newest first",
+        manual_parameters=[
+            openapi.Parameter(
+                'cursor', openapi.IN_QUERY,
+                description="Opaque cursor taken from the next/previous links",
+                type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'page_size', openapi.IN_QUERY,
+                description="Number of activities per page (max 100)",
+                type=openapi.TYPE_INTEGER
+            )
+        ],
+        responses={
+            200: openapi.Response(
+                description="Feed page",
+                schema=ActivitySerializer(many=True),
+                examples={'application/json': _FEED_PAGE_EXAMPLE}
+            )
+        },
+        tags=['Social']
+    )
+    @action(detail=False, methods=['get'], url_path='me/feed', pagination_class=FeedCursorPagination)
+    def feed(self, request):
+        """Retrieve the current user's activity feed"""
+        activities = self.paginate_queryset(self.feed_service.get_feed(request.user))
+        return self.get_paginated_response(ActivitySerializer(activities, many=True).data)
+
     @swagger_auto_schema(
         operation_summary="Current user profile",
         operation_description="Retrieve or update authenticated user's profile",
@@ -198,7 +272,7 @@ class UserViewSet(viewsets.ModelViewSet):
         """Handle current user profile operations"""
         if request.method == 'GET':
             return Response(
-                self.get_serializer(request.user).data
+                self.get_serializer(self.get_queryset().get(pk=request.user.pk)).data
             )
 
         serializer = self.get_serializer(
@@ -208,6 +282,7 @@ class UserViewSet(viewsets.ModelViewSet):
         )
         serializer.is_valid(raise_exception=True)
         serializer.save()
+        EventDetailCacheService.invalidate_organized_by(request.user.id)
         return Response(serializer.data)
 
 
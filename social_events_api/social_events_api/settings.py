@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
@@ -72,6 +73,60 @@ REST_FRAMEWORK = {
     
 }
 
+# Anonymous event search response cache (per process)
+EVENT_SEARCH_CACHE = {
+    'TTL': 60,
+    'MAX_ENTRIES': 1024,
+}
+
+# Rendered event detail cache (per process, validated against per-event versions)
+EVENT_DETAIL_CACHE = {
+    'TTL': 300,
+    'MAX_ENTRIES': 4096,
+}
+
+# In-process follow graph: reloaded from UserFollow at least every MAX_AGE seconds, which also picks
+# up follows changed outside the follow endpoint (admin edits, deleted users)
+FOLLOW_GRAPH = {
+    'MAX_AGE': 300,
+}
+
+# Door check-in: token validity after the event ends and batching of recorded check-ins
+EVENT_CHECKIN = {
+    'TOKEN_GRACE_HOURS': 12,
+    'BATCH_SIZE': 200,
+    'FLUSH_INTERVAL': 2.0,
+}
+
+# Write-behind buffering of comment likes and event favorites (per process, off by default)
+WRITE_BEHIND_TOGGLES = {
+    'ENABLED': False,
+    'MAX_PENDING': 500,
+    'FLUSH_INTERVAL': 1.0,
+}
+
+# Activity feed: accounts with more followers than FANOUT_THRESHOLD are merged into feeds when read
+# instead of being copied into every follower's feed; feeds keep their MAX_LENGTH newest entries
+ACTIVITY_FEED = {
+    'FANOUT_THRESHOLD': 1000,
+    'MAX_LENGTH': 500,
+}
+
+# Event recommendations: top-K kept per user and the weights of the normalized scoring signals
+EVENT_RECOMMENDATIONS = {
+    'TOP_K': 20,
+    'USER_CHUNK_SIZE': 1000,
+    'MAX_CANDIDATES': 5000,
+    'RECENCY_DAYS': 14,
+    'WEIGHTS': {
+        'category': 1.0,
+        'followee_registrations': 0.8,
+        'followee_favorites': 0.4,
+        'popularity': 0.3,
+        'recency': 0.2,
+    },
+}
+
 ROOT_URLCONF = 'social_events_api.urls'
 
 TEMPLATES = [
@@ -101,9 +156,31 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # A file rather than the in-memory default, so the threads of the concurrency tests share it
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
+# The default cache stays per process: throttling and rate limiting hit it on every request.
+# The generation counters of the search and detail caches, the comment ETag versions and the
+# follow graph generation live in the 'generations' alias, which every worker must share.
+# Set REDIS_URL in production (requires the redis package); otherwise a database cache is used,
+# whose table is created by the events migrations.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'generations': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+    } if os.environ.get('REDIS_URL') else {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'generation_cache',
+        # Counters are few but per-event versions grow with the events; keep culling rare
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+}
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),